@@ -32,6 +32,17 @@ def qv_mult(q1, v1):
     q2 = np.insert(v1, 0,0)
     return q_mult(q_mult(q1, q2), q_conjugate(q1))[1:]
 
+##---- quaternion rotation matrix --------------------------------------------##
+## multiplying a vector by this matrix is the same as qv_mult, so its columns
+## are the x, y, and z unit vectors rotated by the quaternion. it is not
+## normalized first, the same as qv_mult
+def q_to_matrix(q):
+    w, x, y, z = q
+    ww, xx, yy, zz = w*w, x*x, y*y, z*z
+    return np.array([[ww + xx - yy - zz, 2*(x*y - w*z), 2*(x*z + w*y)],
+                     [2*(x*y + w*z), ww - xx + yy - zz, 2*(y*z - w*x)],
+                     [2*(x*z - w*y), 2*(y*z + w*x), ww - xx - yy + zz]])
+
 if __name__ == "__main__":
     q1 = q_normalize(np.array([np.pi/4.0, 0, 1, 0] ))
     v1 = np.array([0,0,1])
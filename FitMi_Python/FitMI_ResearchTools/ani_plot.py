@@ -3,6 +3,7 @@
 ##----------------------------------------------------------------------------##
 
 from matplotlib import pyplot as plt
+import numpy as np
 
 class AniPlot(object):
     def __init__(self, fig, spltnum, buffmin=0, buffmax=200, ymin=-180, ymax=180, double=False):
@@ -16,11 +17,13 @@ class AniPlot(object):
 
         self.bg = fig.canvas.copy_from_bbox(self.ax.bbox)
 
-        self.buff = [0]*(buffmax - buffmin)
+        ## the buffers are arrays from the start so matplotlib does not convert
+        ## a list on every frame.
+        self.buff = np.zeros(buffmax - buffmin, dtype=np.float32)
         self.buff2 = None
         if double:
-            self.buff2 = [0]*(buffmax - buffmin)
-        self.xpts = range(buffmin, buffmax)
+            self.buff2 = np.zeros(buffmax - buffmin, dtype=np.float32)
+        self.xpts = np.arange(buffmin, buffmax)
 
         self.plt = self.ax.plot(self.xpts, self.buff, '-', color="b")[0]
         self.plt2 = None
@@ -34,21 +37,25 @@ class AniPlot(object):
         self.ax.set_ylabel(axname)
 
     def update(self, data1, data2=None):
-        self.buff.pop(0)
-        self.buff.append(data1)
+        self.buff[:-1] = self.buff[1:]
+        self.buff[-1] = data1
 
         if (not data2 is None) and (not self.buff2 is None):
-            self.buff2.pop(0)
-            self.buff2.append(data2)
+            self.buff2[:-1] = self.buff2[1:]
+            self.buff2[-1] = data2
 
-    def draw(self, fig):
-        self.plt.set_data(self.xpts, self.buff)
-        if self.plt2 and self.buff2:
-            self.plt2.set_data(self.xpts, self.buff2)
+    ## draws the lines over the background without showing them so a figure
+    ## of many plots can show all of them with one blit
+    def draw_lines(self, fig):
+        self.plt.set_ydata(self.buff)
+        if self.plt2 and (not self.buff2 is None):
+            self.plt2.set_ydata(self.buff2)
 
         fig.canvas.restore_region(self.bg)
         self.ax.draw_artist(self.plt)
         if self.plt2:
             self.ax.draw_artist(self.plt2)
 
+    def draw(self, fig):
+        self.draw_lines(fig)
         fig.canvas.blit(self.ax.bbox)
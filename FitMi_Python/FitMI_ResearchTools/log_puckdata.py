@@ -1,16 +1,33 @@
 ##----------------------------------------------------------------------------##
 ##---- log puck data ---------------------------------------------------------##
 ##----------------------------------------------------------------------------##
-## This will log puck data to a file. it saves the file as a python dictionary
-## and also as a .mat file.
+## This will log puck data to a file. it saves the file as a .mat file.
+## NOTE: this logger is kept for reference only. Use log_puck_data.py in
+## FitMi_Python3_Converstion, which stores each sample as one row per puck
+## and streams polling on its own thread.
 
 import os
-import shelve
+import sys
+import select
 import numpy as np
 from scipy import io
-import threading
 from Puck.hid_puck import *
 
+## columns of each puck's data array for each data type.
+XL_COLS = slice(0, 3)
+GY_COLS = slice(3, 6)
+MAG_COLS = slice(6, 9)
+LOADCELL_COLS = slice(9, 10)
+QUAT_COLS = slice(10, 14)
+N_COLS = 14
+
+## msvcrt is used to check for enter on windows, where select can not watch
+## the console.
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
 class PuckLogger(object):
     ##---- initialize the puck logger ----------------------------------------##
     def __init__(self):
@@ -23,25 +40,20 @@ class PuckLogger(object):
 
         self.current_samp = 0
         self.n_samples = None
-        self.p0_xl = None
-        self.p0_gy = None
-        self.p0_mag = None
-        self.p0_loadcell = None
-        self.p0_quat = None
-
-        self.p1_xl = None
-        self.p1_gy = None
-        self.p1_mag = None
-        self.p1_loadcell = None
-        self.p1_quat = None
-
-        self.checkstop_thread = threading.Thread(target=self.check_stop)
-        self.checkstop_thread.daemon = True
+        ## one row per sample, split into the data types by the column slices.
+        self.p0_data = None
+        self.p1_data = None
 
     ##---- check if we want to pause the recording ---------------------------##
+    ## called once per sample, so it only checks if enter was pressed and never
+    ## waits for it.
     def check_stop(self):
-        while self.keep_running:
-            response = raw_input("press enter to stop logging.")
+        if msvcrt is not None:
+            while msvcrt.kbhit():
+                if msvcrt.getwch() in "\r\n":
+                    self.keep_running = False
+        elif select.select([sys.stdin], [], [], 0)[0]:
+            sys.stdin.readline()
             self.keep_running = False
 
     ##---- run ---------------------------------------------------------------##
@@ -52,26 +64,19 @@ class PuckLogger(object):
         self.puck.sendCommand(0,SENDVEL, 0x00, 0x00)
         self.puck.sendCommand(1,SENDVEL, 0x00, 0x00)
 
-        print "recording data"
-        self.checkstop_thread.start()
+        print("recording data")
+        print("press enter to stop logging.")
         self.current_samp = 0
         while self.keep_running and (self.current_samp < self.n_samples):
+            self.check_stop()
             self.puck.checkForNewPuckData()
             self.store_data(self.puck.puckpack0, self.puck.puckpack1)
             time.sleep(1.0/self.fs)
 
         ## crop away any unused space.
         if self.current_samp < self.n_samples:
-            self.p0_xl = self.p0_xl[self.current_samp, :]
-            self.p0_gy = self.p0_gy[self.current_samp, :]
-            self.p0_mag = self.p0_mag[self.current_samp, :]
-            self.p0_loadcell = self.p0_loadcell[self.current_samp, :]
-            self.p0_quat = self.p0_quat[self.current_samp, :]
-            self.p1_xl = self.p1_xl[self.current_samp, :]
-            self.p1_gy = self.p1_gy[self.current_samp, :]
-            self.p1_mag = self.p1_mag[self.current_samp, :]
-            self.p1_loadcell = self.p1_loadcell[self.current_samp, :]
-            self.p1_quat = self.p1_quat[self.current_samp, :]
+            self.p0_data.resize((self.current_samp, N_COLS), refcheck=False)
+            self.p1_data.resize((self.current_samp, N_COLS), refcheck=False)
 
     ##---- set filename ------------------------------------------------------##
     def set_filename(self):
@@ -87,54 +92,49 @@ class PuckLogger(object):
                 n_minutes = float(raw_input(message))
                 gotdata = True
             except:
-                print "you need to input a number"
+                print("you need to input a number")
 
         if (n_minutes > 60) or (n_minutes < 0):
-            print "please enter a number between 0 and 60"
+            print("please enter a number between 0 and 60")
             self.set_recording_length()
             return
 
         n_samples = int(n_minutes*60*self.fs)
         self.n_samples = n_samples
-        self.p0_xl = np.zeros([n_samples, 3])
-        self.p0_gy = np.zeros([n_samples, 3])
-        self.p0_mag = np.zeros([n_samples, 3])
-        self.p0_loadcell = np.zeros([n_samples, 1])
-        self.p0_quat = np.zeros([n_samples, 4])
-        self.p1_xl = np.zeros([n_samples, 3])
-        self.p1_gy = np.zeros([n_samples, 3])
-        self.p1_mag = np.zeros([n_samples, 3])
-        self.p1_loadcell = np.zeros([n_samples, 1])
-        self.p1_quat = np.zeros([n_samples, 4])
+        self.p0_data = np.zeros([n_samples, N_COLS], dtype=np.float32)
+        self.p1_data = np.zeros([n_samples, N_COLS], dtype=np.float32)
 
     ##---- write data line ---------------------------------------------------##
+    ## each puck's sample is gathered into one row so it is stored with a
+    ## single assignment.
     def store_data(self, ppack0, ppack1):
-        self.p0_xl[self.current_samp, :] = ppack0.accel
-        self.p0_gy[self.current_samp, :] = ppack0.gyro
-        self.p0_mag[self.current_samp, :] = ppack0.magnetometer
-        self.p0_loadcell[self.current_samp, :] = ppack0.loadcell
-        self.p0_quat[self.current_samp, :] = ppack0.quat
-
-        self.p1_xl[self.current_samp, :] = ppack1.accel
-        self.p1_gy[self.current_samp, :] = ppack1.gyro
-        self.p1_mag[self.current_samp, :] = ppack1.magnetometer
-        self.p1_loadcell[self.current_samp, :] = ppack1.loadcell
-        self.p1_quat[self.current_samp, :] = ppack1.quat
+        self.p0_data[self.current_samp, :] = self.pack_row(ppack0)
+        self.p1_data[self.current_samp, :] = self.pack_row(ppack1)
         self.current_samp += 1
 
+    ##---- gather a puck's data into one row ---------------------------------##
+    ## the packet's vectors can be 1 x 3 matrices, so they are flattened first.
+    def pack_row(self, ppack):
+        return np.concatenate([np.asarray(values).ravel() for values in
+                               (ppack.accel, ppack.gyro, ppack.magnetometer,
+                                [ppack.loadcell], ppack.quat)])
+
     ##---- write data to files -----------------------------------------------##
     def write_data(self):
         ddict = {
-            "p0_xl": self.p0_xl, "p0_gy": self.p0_gy, "p0_mag": self.p0_mag,
-            "p0_loadcell": self.p0_loadcell, "p0_quat": self.p0_quat,
-            "p1_xl": self.p1_xl, "p1_gy": self.p1_gy, "p1_mag": self.p1_mag,
-            "p1_loadcell": self.p1_loadcell, "p1_quat": self.p1_quat
+            "p0_xl": self.p0_data[:, XL_COLS],
+            "p0_gy": self.p0_data[:, GY_COLS],
+            "p0_mag": self.p0_data[:, MAG_COLS],
+            "p0_loadcell": self.p0_data[:, LOADCELL_COLS],
+            "p0_quat": self.p0_data[:, QUAT_COLS],
+            "p1_xl": self.p1_data[:, XL_COLS],
+            "p1_gy": self.p1_data[:, GY_COLS],
+            "p1_mag": self.p1_data[:, MAG_COLS],
+            "p1_loadcell": self.p1_data[:, LOADCELL_COLS],
+            "p1_quat": self.p1_data[:, QUAT_COLS]
             }
-        shelvename = os.path.join(self.datafolder, self.fname+".shelve")
-        datash = shelve.open(shelvename)
-        for key in ddict.keys():
-            datash[key] = ddict[key]
-        datash.close()
+        if not os.path.exists(self.datafolder):
+            os.makedirs(self.datafolder)
 
         matpath = os.path.join(self.datafolder, self.fname+".mat")
         io.savemat(matpath, ddict, appendmat=False)
@@ -146,10 +146,6 @@ class PuckLogger(object):
         #self.puck.setTouchBuzz(1,1)
         self.puck.close()
         self.write_data()
-        try:
-            self.checkstop_thread.join(2)
-        except:
-            pass
 
 if __name__ == "__main__":
     plogger = PuckLogger()
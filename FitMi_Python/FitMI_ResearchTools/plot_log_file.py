@@ -5,11 +5,11 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import os
-import shelve
+from scipy import io
 
 datafolder = os.path.join(os.getcwd(), "data")
 fname = raw_input("enter the name of the file you want to plot (without extension): ")
-fname += ".shelve"
+fname += ".mat"
 fullpath = os.path.join(datafolder, fname)
 print fullpath
 
@@ -17,17 +17,16 @@ if not os.path.exists(fullpath):
     errorstr = "%s not found" % fullpath
     raise Exception(errorstr)
 
-datash = shelve.open(fullpath)
+datamat = io.loadmat(fullpath)
+datakeys = [key for key in datamat.keys() if not key.startswith("__")]
 
-print datash.keys()
+print datakeys
 
-for key in datash.keys():
+for key in datakeys:
     fig = plt.figure()
     ax = fig.add_subplot(111)
-    ax.plot(datash[key])
+    ax.plot(datamat[key])
     ax.set_title(key)
     fig.show()
 
-datash.close()
-
 raw_input("press enter to close all")
@@ -3,7 +3,7 @@ import ttk
 import time
 import threading
 import random
-import Queue
+import collections
 import matplotlib
 import numpy
 import sys
@@ -19,6 +19,24 @@ from matplotlib import pyplot as plt
 from Puck import HIDPuckDongle
 from Puck.hid_puck import *
 
+#Functions that get each sensor's value from a puck packet, keyed by the sensor's name
+#in the selection box
+SENSOR_GETTERS = {
+    'Loadcell': lambda ppack: ppack.loadcell,
+    'Accelerometer (x)': lambda ppack: ppack.accel[0, 0],
+    'Accelerometer (y)': lambda ppack: ppack.accel[0, 1],
+    'Accelerometer (z)': lambda ppack: ppack.accel[0, 2],
+    'Gyrometer (x)': lambda ppack: ppack.gyro[0, 0],
+    'Gyrometer (y)': lambda ppack: ppack.gyro[0, 1],
+    'Gyrometer (z)': lambda ppack: ppack.gyro[0, 2],
+    'Magnetometer (x)': lambda ppack: ppack.magnetometer[0, 0],
+    'Magnetometer (y)': lambda ppack: ppack.magnetometer[0, 1],
+    'Magnetometer (z)': lambda ppack: ppack.magnetometer[0, 2],
+    'Velocity (x)': lambda ppack: ppack.velocity[0, 0],
+    'Velocity (y)': lambda ppack: ppack.velocity[0, 1],
+    'Velocity (z)': lambda ppack: ppack.velocity[0, 2],
+}
+
 #This is the UI part of the app
 class MainApp:
 
@@ -35,6 +53,7 @@ class MainApp:
                                         'Magnetometer (x)', 'Magnetometer (y)', 'Magnetometer (z)', \
                                         'Velocity (x)', 'Velocity (y)', 'Velocity (z)' )
         self.selection_box.current(0)
+        self.selection_box.bind('<<ComboboxSelected>>', self.selection_changed)
         self.selection_box.pack()
 
         #Add a button to signal that we want to start a new trial
@@ -45,8 +64,12 @@ class MainApp:
         self.vns_label = tk.Label(self.gui, text='Waiting for VNS signal...')
         self.vns_label.pack()
 
-        #Create buffers to store all of the streaming data
-        self.plot_buffer = numpy.zeros((1, 200)).tolist()[0]
+        #Create a ring buffer to store the streaming data. New data overwrites
+        #the oldest data at plot_index so nothing is shifted or reallocated
+        self.plot_buffer = numpy.zeros(200, dtype=numpy.float32)
+        self.plot_index = 0
+        #The unrolled buffer that is plotted. It is reused so no array is made per update
+        self.plot_y_data = numpy.zeros_like(self.plot_buffer)
 
         #Create a figure
         self.canvas_fig = plt.figure(1)
@@ -54,13 +77,20 @@ class MainApp:
 
         #Create a subplot
         FigSubPlot = Fig.add_subplot(1, 1, 1)
-        x_data = range(len(self.plot_buffer))
-        y_data = self.plot_buffer
-        self.plot_line, = FigSubPlot.plot(x_data, y_data, 'r-')
+        x_data = numpy.arange(len(self.plot_buffer))
+        y_data = self.plot_y_data
+        #The line is animated so it is only drawn by blitting and not in full draws
+        self.plot_line, = FigSubPlot.plot(x_data, y_data, 'r-', animated=True)
+        self.plot_axes = FigSubPlot
             
         #Get the figure canvas
         self.plot_canvas = FigureCanvasTkAgg(Fig, master=self.gui)
 
+        #Copy the plot without the line whenever it is fully drawn, such as after a
+        #resize, so each update only redraws the line
+        self.plot_background = None
+        self.plot_canvas.mpl_connect('draw_event', self.on_draw)
+
         #Display the figure canvas
         self.plot_canvas.show()
 
@@ -70,6 +100,7 @@ class MainApp:
         ax = self.plot_canvas.figure.axes[0]
         ax.set_xlim(0, 200)
         ax.set_ylim(0, 1024)
+        self.plot_canvas.draw()
 
         #Update the gui
         self.gui.update()
@@ -84,35 +115,49 @@ class MainApp:
         self.end_time = datetime.datetime.now()
         self.loop_count = 0
 
-        #Make an instance of the background thread
+        #Make an instance of the background thread and give it the selected sensor
         self.background_thread = BackgroundThread()
+        self.selection_changed()
 
         #Start a periodic call on the GUI thread to check for updates form the background thread
         self.periodic_gui_update()
 
 
+    def on_draw(self, event):
+        self.plot_background = self.plot_canvas.copy_from_bbox(self.plot_axes.bbox)
+        self.plot_axes.draw_artist(self.plot_line)
+
+    def add_to_plot_buffer(self, new_data):
+        #Only the newest data that fits in the buffer is kept
+        buffer_length = len(self.plot_buffer)
+        new_data = new_data[-buffer_length:]
+
+        #Write the data up to the end of the buffer and wrap the rest to its start
+        split = min(len(new_data), buffer_length - self.plot_index)
+        self.plot_buffer[self.plot_index:self.plot_index + split] = new_data[:split]
+        self.plot_buffer[:len(new_data) - split] = new_data[split:]
+        self.plot_index = (self.plot_index + len(new_data)) % buffer_length
+
     def process_incoming_data(self):
-        while self.background_thread.msg_queue_background_to_foreground.qsize():
-            try:
-                new_data = []
-                with self.background_thread.msg_queue_background_to_foreground.mutex:
-                    new_data = list(self.background_thread.msg_queue_background_to_foreground.queue)
-                    self.background_thread.msg_queue_background_to_foreground.queue.clear()
-                self.plot_buffer.extend(new_data)
-            except Queue.Empty:
-                pass
-
-        #Keep plot buffer to 200 elements
-        plot_buf_len = len(self.plot_buffer)
-        if plot_buf_len > 200:
-            num_to_cut = plot_buf_len - 200
-            self.plot_buffer = self.plot_buffer[num_to_cut:]
-
-        y_data = self.plot_buffer
-        x_data = range(len(y_data))
-
-        self.plot_line.set_data(x_data, y_data)
-        self.plot_canvas.draw()
+        #Take only the data that is in the deque now. popleft is atomic, so data the
+        #background thread adds while this runs is left for the next update
+        streaming_data = self.background_thread.streaming_data
+        new_data = [streaming_data.popleft() for _ in range(len(streaming_data))]
+        if new_data:
+            self.add_to_plot_buffer(new_data)
+
+        #Unroll the ring buffer so the oldest data is plotted first
+        split = len(self.plot_buffer) - self.plot_index
+        self.plot_y_data[:split] = self.plot_buffer[self.plot_index:]
+        self.plot_y_data[split:] = self.plot_buffer[:self.plot_index]
+
+        self.plot_line.set_ydata(self.plot_y_data)
+
+        #Redraw only the line over the copied plot and show just the plot's area
+        if self.plot_background is not None:
+            self.plot_canvas.restore_region(self.plot_background)
+            self.plot_axes.draw_artist(self.plot_line)
+            self.plot_canvas.blit(self.plot_axes.bbox)
 
         #Determine whether to indicate that VNS is active or not active
         with self.background_thread.vns_active_mutex:
@@ -136,9 +181,6 @@ class MainApp:
         #Process any new data that has come in from the background thread
         self.process_incoming_data()
 
-        #Add the currently selected value to the msg queue
-        self.background_thread.msg_queue_foreground_to_background.put(self.selected_value)
-
         #Check the "is_running" flag. If not running, exit the program
         if not self.background_thread.is_running:
             sys.exit(1)
@@ -146,6 +188,11 @@ class MainApp:
         #Make sure to to a periodic check on the GUI every 33 ms
         self.gui.after(10, self.periodic_gui_update)
 
+    def selection_changed(self, event=None):
+        #Hand the selected sensor to the background thread. The string is read here on
+        #the GUI thread since tk variables are not safe to read from other threads
+        self.background_thread.selected_string = self.selected_value.get()
+
     def end_application(self):
         self.background_thread.shutdown_background_thread()
 
@@ -154,20 +201,31 @@ class MainApp:
             self.background_thread.initiate_trial = True
 
 class Trial:
-    def __init__(self):
-        self.signal = []
+    def __init__(self, trial_length=200):
+        #The signal is preallocated for the whole trial and filled in as it runs
+        self.signal = numpy.zeros(trial_length, dtype=numpy.float32)
+        self.num_samples = 0
+        #The largest value of the signal, kept as the signal is gathered
+        self.peak = float('-inf')
         self.vns = 0
 
 class Session:
     def __init__(self):
         self.trials = []
+        #Sum of the peaks of the trials, kept as trials are added
+        self.peak_total = 0
         self.vns_threshold = 0
 
+    def add_trial(self, trial):
+        self.trials.append(trial)
+        self.peak_total += trial.peak
+
+    def clear_trials(self):
+        self.trials = []
+        self.peak_total = 0
+
     def determine_new_vns_threshold(self):
-        max_of_each_trial = []
-        for t in self.trials:
-            max_of_each_trial.append(max(t.signal))
-        self.vns_threshold = sum(max_of_each_trial) / len(max_of_each_trial)
+        self.vns_threshold = self.peak_total / len(self.trials)
 
 #This is the background process part of the app
 class BackgroundThread:
@@ -188,8 +246,11 @@ class BackgroundThread:
         self.puck_data_1 = self.puck.puckpack0
 
         self.is_running = 1
-        self.msg_queue_foreground_to_background = Queue.Queue()
-        self.msg_queue_background_to_foreground = Queue.Queue()
+        #The sensor the GUI selected. Assigning a string is atomic, so no lock is needed
+        self.selected_string = ''
+        #Streaming data for the GUI. Only the newest plot's worth is kept if the GUI
+        #falls behind
+        self.streaming_data = collections.deque(maxlen=200)
 
         self.initiate_trial = False
         self.initiate_trial_mutex = threading.Lock()
@@ -209,29 +270,19 @@ class BackgroundThread:
     def background_thread_function(self):
         #Loop as long as the program is running
         selected_string = ''
-        new_selected_string = ''
+        get_streaming_data = None
 
         while self.is_running:
-            
-            while self.msg_queue_foreground_to_background.qsize():
-                try:
-                    with self.msg_queue_foreground_to_background.mutex:
-                        item_queue = list(self.msg_queue_foreground_to_background.queue)
-                        if len(item_queue) > 0:
-                            new_selected_string = item_queue[0].get()
-                            if new_selected_string is not None:
-                                if new_selected_string != '':
-                                    if new_selected_string != selected_string:
-                                        #Remember the sensor the user selected
-                                        selected_string = new_selected_string
-                                        #Clear the list of trials for this session and start fresh
-                                        self.session.trials = []
-                                        self.current_trial = Trial()
-                                        self.trial_state = -1
-
-                        self.msg_queue_foreground_to_background.queue.clear()
-                except Queue.Empty:
-                    pass
+
+            new_selected_string = self.selected_string
+            if new_selected_string != '' and new_selected_string != selected_string:
+                #Remember the sensor the user selected and how to get its data
+                selected_string = new_selected_string
+                get_streaming_data = SENSOR_GETTERS.get(selected_string)
+                #Clear the list of trials for this session and start fresh
+                self.session.clear_trials()
+                self.current_trial = Trial()
+                self.trial_state = -1
 
             #Add random numbers to the queue
             #new_num = rand.randint(-10, 10)
@@ -240,35 +291,11 @@ class BackgroundThread:
 
             #Check to see what data we need to send back to the GUI
             new_streaming_data = 0
-            if (selected_string == 'Accelerometer (x)'):
-                new_streaming_data = self.puck_data_1.accel[0, 0]
-            elif (selected_string == 'Accelerometer (y)'):
-                new_streaming_data = self.puck_data_1.accel[0, 1]
-            elif (selected_string == 'Accelerometer (z)'):
-                new_streaming_data = self.puck_data_1.accel[0, 2]
-            elif (selected_string == 'Gyrometer (x)'):
-                new_streaming_data = self.puck_data_1.gyro[0, 0]
-            elif (selected_string == 'Gyrometer (y)'):
-                new_streaming_data = self.puck_data_1.gyro[0, 1]
-            elif (selected_string == 'Gyrometer (z)'):
-                new_streaming_data = self.puck_data_1.gyro[0, 2]
-            elif (selected_string == 'Magnetometer (x)'):
-                new_streaming_data = self.puck_data_1.magnetometer[0, 0]
-            elif (selected_string == 'Magnetometer (y)'):
-                new_streaming_data = self.puck_data_1.magnetometer[0, 1]
-            elif (selected_string == 'Magnetometer (z)'):
-                new_streaming_data = self.puck_data_1.magnetometer[0, 2]
-            elif (selected_string == 'Velocity (x)'):
-                new_streaming_data = self.puck_data_1.velocity[0, 0]
-            elif (selected_string == 'Velocity (y)'):
-                new_streaming_data = self.puck_data_1.velocity[0, 1]
-            elif (selected_string == 'Velocity (z)'):
-                new_streaming_data = self.puck_data_1.velocity[0, 2]
-            elif (selected_string == 'Loadcell'):
-                new_streaming_data = self.puck_data_1.loadcell
+            if get_streaming_data is not None:
+                new_streaming_data = get_streaming_data(self.puck_data_1)
             
             #Send the data to the GUI for graphing purposes
-            self.msg_queue_background_to_foreground.put(new_streaming_data)
+            self.streaming_data.append(new_streaming_data)
 
             #Check to see if the user has initiated a trial
             with self.initiate_trial_mutex:
@@ -283,24 +310,27 @@ class BackgroundThread:
                 self.trial_state = 1
             elif self.trial_state == 1:
                 #Gather data for this trial
-                self.current_trial.signal.append(new_streaming_data)
+                trial = self.current_trial
+                trial.signal[trial.num_samples] = new_streaming_data
+                trial.num_samples += 1
+                if new_streaming_data > trial.peak:
+                    trial.peak = new_streaming_data
 
                 #Determine whether to deliver VNS
                 if (len(self.session.trials) > 1):
-                    this_trial_pk = max(self.current_trial.signal)
-                    if this_trial_pk >= self.session.vns_threshold:
+                    if trial.peak >= self.session.vns_threshold:
                         with self.vns_active_mutex:
                             self.vns_active = True
 
                 #Check to see if we have gathered enough data to complete this trial
-                if (len(self.current_trial.signal) >= 200):
+                if (trial.num_samples >= len(trial.signal)):
                     self.trial_state = 2
             elif self.trial_state == 2:
                 #Turn of the VNS signal
                 with self.vns_active_mutex:
                     self.vns_active = False
                 #Finalize the trial, save it in the session model
-                self.session.trials.append(self.current_trial)
+                self.session.add_trial(self.current_trial)
                 #Determine new vns threshold for next trial
                 self.session.determine_new_vns_threshold()
                 #Change the trial state to indicate that no trial is running
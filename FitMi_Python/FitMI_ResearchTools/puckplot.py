@@ -1,9 +1,9 @@
 #!/usr/bin/env python
 
-import numpy as np
 import time
 import matplotlib
 from matplotlib import pyplot as plt
+from matplotlib.transforms import Bbox
 from ani_plot import AniPlot
 
 from Puck import HIDPuckDongle
@@ -33,7 +33,9 @@ class PuckPlotter(object):
 
         self.lcplot = AniPlot(self.fig, 414, buffmin, buffmax,
                                         ymin=-100, ymax=1100, double=True)
-        self.lcplot_red = False
+        ## touch state each load cell line was last colored for. None until
+        ## the first sample so both lines are colored then
+        self.lcplot_touch = [None, None]
         self.time = 0
         self.puck = HIDPuckDongle()
         self.plt1.set_ylabel("vert angle")
@@ -41,6 +43,10 @@ class PuckPlotter(object):
         self.plt3.set_ylabel("accel x")
         self.lcplot.set_ylabel("loadcell")
 
+        ## the area of all four plots so a frame is shown with one blit
+        self.plots = [self.plt1, self.plt2, self.plt3, self.lcplot]
+        self.plot_bbox = Bbox.union([p.ax.bbox for p in self.plots])
+
     def start(self):
         self.puck.open()
         self.puck.sendCommand(0,SENDVEL, 0x00, 0x01)
@@ -68,30 +74,35 @@ class PuckPlotter(object):
         # update the xy data
         self.update_buffers(puckdata, puckdata2)
 
-        self.plt1.draw(self.fig)
-        self.plt2.draw(self.fig)
-        self.plt3.draw(self.fig)
-        self.lcplot.draw(self.fig)
+        ## only recolor a load cell line when its puck's touch state changes.
+        ## this is done before drawing so a touch shows on the same frame
+        touch = bool(puckdata.touch)
+        if touch != self.lcplot_touch[0]:
+            self.lcplot.plt.set_color("r" if touch else "b")
+            self.lcplot_touch[0] = touch
 
-        if puckdata.touch:
-            self.lcplot.plt.set_color("r")
-        else:
-            self.lcplot.plt.set_color("b")
+        touch2 = bool(puckdata2.touch)
+        if self.lcplot.plt2 and touch2 != self.lcplot_touch[1]:
+            self.lcplot.plt2.set_color("r" if touch2 else "b")
+            self.lcplot_touch[1] = touch2
 
-        if puckdata2.touch and self.lcplot.plt2:
-            self.lcplot.plt2.set_color("r")
-        else:
-            self.lcplot.plt2.set_color("b")
+        for p in self.plots:
+            p.draw_lines(self.fig)
+        self.fig.canvas.blit(self.plot_bbox)
+        self.fig.canvas.flush_events()
 
     ##---- the real update function ------------------------------------------##
     def update_buffers(self, puckdata, puckdata2):
         self.plt1.update(puckdata.getVertAngle(), puckdata2.getVertAngle())
-        self.plt2.update(puckdata.gyro[0,0], puckdata2.gyro[0,0])
-        self.plt3.update(puckdata.accel[0,0], puckdata2.accel[0,0])
+        ## item reads the x values straight out as python numbers
+        self.plt2.update(puckdata.gyro.item(0), puckdata2.gyro.item(0))
+        self.plt3.update(puckdata.accel.item(0), puckdata2.accel.item(0))
         self.lcplot.update(puckdata.loadcell, puckdata2.loadcell)
-        puckdata.getVertAngle()
 
-        if np.linalg.norm(puckdata2.accel) > 1500:
+        ## compare the squared magnitude as python ints so there is no sqrt or
+        ## numpy call on the 3 values and the squares can not overflow
+        ax, ay, az = puckdata2.accel.tolist()[0]
+        if ax*ax + ay*ay + az*az > 1500*1500:
             self.puck.actuate(1, 500, 100)
         #self.puck.sendCommand(0, RBLINK, 0x01, 0x21)
         #print puckdata.resv3 # resv3 is currently set up to tell us if in gaming state
@@ -9,15 +9,12 @@
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 from mpl_toolkits.mplot3d.art3d import juggle_axes
-import matplotlib
 
 from Puck.Quaternion import *
 
 from Puck import HIDPuckDongle
 from Puck.hid_puck import *
 
-matplotlib.interactive(True)
-
 class OrientationScope(object):
     def __init__(self, pucknum=0):
         self.puck = HIDPuckDongle()
@@ -33,13 +30,17 @@ class OrientationScope(object):
         self.ax.set_ylim(-2, 2)
         self.ax.set_zlim(-2, 2)
 
-        self.fig.show(False)
-        plt.draw()
-        self.bg = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        ## the scatter is made once and only its points move. it is animated
+        ## so the full draw leaves it out of the background used for blitting
         linex = [0, 1, 0, 0]
         liney = [0, 0, 1, 0]
         linez = [0, 0, 0, 1]
-        self.datplot = self.ax.scatter(linex, liney, linez, c="b")
+        self.datplot = self.ax.scatter(linex, liney, linez, c="b",
+                                       animated=True)
+
+        self.fig.show(False)
+        self.fig.canvas.draw()
+        self.bg = self.fig.canvas.copy_from_bbox(self.ax.bbox)
 
     def start_scope(self):
         self.puck.open()
@@ -67,25 +68,22 @@ class OrientationScope(object):
         else:
             pdata = self.puck.puckpack0
 
-        vx = np.array([1,0,0])
-        vx = qv_mult(pdata.quat, vx)
-
-        vy = np.array([0,1,0])
-        vy = qv_mult(pdata.quat, vy)
-
-        vz = np.array([0,0,1])
-        vz = qv_mult(pdata.quat, vz)
-
-        linex = [0, vx[0], vy[0], vz[0]]
-        liney = [0, vx[1], vy[1], vz[1]]
-        linez = [0, vx[2], vy[2], vz[2]]
-
-        if self.datplot:
-            self.ax.collections.remove(self.datplot)
-        self.datplot = self.ax.scatter(linex, liney, linez, c="b")
-        plt.pause(.00005)
-
-        # self.datplot._offsets3d = juggle_axes(linex, liney, linez, 'z')
+        ## the rows of the rotation matrix are the x, y, and z coordinates of
+        ## the rotated axes, so the three axes come from one matrix
+        rot = q_to_matrix(pdata.quat)
+        linex = [0, rot[0,0], rot[0,1], rot[0,2]]
+        liney = [0, rot[1,0], rot[1,1], rot[1,2]]
+        linez = [0, rot[2,0], rot[2,1], rot[2,2]]
+
+        ## move the points and blit only the scatter over the background.
+        ## flush_events lets the window update without plt.pause's full redraw
+        ## and its minimum wait
+        self.datplot._offsets3d = juggle_axes(linex, liney, linez, 'z')
+        self.fig.canvas.restore_region(self.bg)
+        self.datplot.do_3d_projection(self.fig.canvas.get_renderer())
+        self.ax.draw_artist(self.datplot)
+        self.fig.canvas.blit(self.ax.bbox)
+        self.fig.canvas.flush_events()
 
 if __name__ == "__main__":
     oscope = OrientationScope()
@@ -19,6 +19,9 @@ puck_packet
     charging indicator, connection indicator, touch status, status for the IMU,
     status for if the velocity is polled, the state, and a variable called
     res_v5
+puck_packet_c
+    Optional compiled parser used by PuckPacket. It parses a packet, its
+    status, and the roll, pitch, and yaw angles in a single call
 puck_task
     Class definition of PuckTask. Analyzes a single degree of freedom and
     changes a state variable when the degree of freedom of the puck moves above
@@ -4,7 +4,7 @@ import threading
 import struct
 from Puck.puck_packet import PuckPacket
 import queue
-from typing import Dict
+from typing import Dict, List, Tuple
 import os
 # suppresses pygame welcome message
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
@@ -112,6 +112,8 @@ class HIDPuckDongle(object):
         Extract out the RX radio data from the input stream
     send_command(puck_number, command, message, last_byte)
         Formats a command to one of the pucks
+    send_commands(commands)
+        Formats several commands to the pucks
     note_sending(value)
         Sends a message to the error log
     actuate(puck_number, duration, amplitude, action_type, actuator)
@@ -233,8 +235,8 @@ class HIDPuckDongle(object):
         self.check_connection()
         self.wait_for_data()
 
-        self.send_command(0, GAMEON, 0x00, 0x01)  # puts puck 0 into game mode
-        self.send_command(1, GAMEON, 0x00, 0x01)  # puts puck 1 into game mode
+        # puts both pucks into game mode
+        self.send_commands([(0, GAMEON, 0x00, 0x01), (1, GAMEON, 0x00, 0x01)])
 
     def check_connection(self) -> None:
         '''
@@ -454,9 +456,28 @@ class HIDPuckDongle(object):
         last_byte : int
             modifier for the action
         '''
-        command = (0b11100000 & (puck_number << 5)) | command
-        if self.is_plugged():
-            pass
+        self.send_commands([(puck_number, command, message, last_byte)])
+
+    def send_commands(self,
+                      commands: List[Tuple[int, int, int, int]]) -> None:
+        '''
+        Formats several commands to the pucks
+
+        Checking that the dongle is plugged in lists every hardware input
+        device, so it is done once for all of the commands instead of once per
+        command.
+
+        Parameters
+        ----------
+        commands : List[Tuple[int, int, int, int]]
+            The puck number, command, message, and last byte of each command
+            in the order they are sent. See send_command
+        '''
+        if not self.is_plugged():
+            return
+
+        for puck_number, command, message, last_byte in commands:
+            command = (0b11100000 & (puck_number << 5)) | command
             # put the message in the usb out queue
             if not self.usb_out_queue.full():
                 self.usb_out_queue.put([0x00, command, message, last_byte])
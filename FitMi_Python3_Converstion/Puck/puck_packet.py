@@ -1,8 +1,69 @@
-import struct
 import numpy as np
 from Puck.quaternion import q_rotate_vector
 import math
 
+# use the compiled parser if it has been built, otherwise parse with NumPy
+try:
+    from Puck.puck_packet_c import parse_packet as _parse_packet
+except ImportError:
+    _parse_packet = None
+
+# The data packet is 14 little endian shorts (rotational accelerometer,
+# gyroscope, magnetometer or linear acceleration, quaternion, and load cell)
+# followed by one char for the battery and one char for the status
+SHORTS_PER_PACKET = 14
+BATTERY_INDEX = 28
+STATUS_INDEX = 29
+# bytes of the four quaternion shorts in the data packet
+QUATERNION_BYTES = slice(18, 26)
+
+# number of values in the row of logged data returned by as_row
+ROW_LENGTH = 14
+
+# converts radians to degrees
+_RAD2DEG = 180.0 / math.pi
+
+# Byte alignment of the quaternion buffer so a compiled rotation can use
+# aligned 4 float SIMD loads on it
+QUATERNION_ALIGNMENT = 16
+
+# Unit vectors of the puck's axes used to find its angles. They are read only
+# since they are shared by every packet
+_X_AXIS = np.array([1.0, 0.0, 0.0])
+_Y_AXIS = np.array([0.0, 1.0, 0.0])
+_Z_AXIS = np.array([0.0, 0.0, 1.0])
+for _axis in (_X_AXIS, _Y_AXIS, _Z_AXIS):
+    _axis.setflags(write=False)
+del _axis
+
+
+def _aligned_zeros(length: int, dtype: type = np.float32,
+                   alignment: int = QUATERNION_ALIGNMENT) -> np.ndarray:
+    '''
+    Allocates a zeroed array whose first element sits on an aligned address
+
+    Over allocates a byte buffer and returns the view of it that starts on
+    the first address that is a multiple of the alignment.
+
+    Parameters
+    ----------
+    length : int
+        Number of elements in the returned array
+    dtype : type, default=np.float32
+        Data type of the returned array
+    alignment : int, default=QUATERNION_ALIGNMENT
+        Byte boundary the start of the array is aligned to
+
+    Returns
+    -------
+    numpy array
+        A contiguous array of zeros of the given length and type
+    '''
+    item_size = np.dtype(dtype).itemsize
+    backing = np.zeros(length * item_size + alignment, dtype=np.uint8)
+    offset = -backing.ctypes.data % alignment
+    return backing[offset:offset + length * item_size].view(dtype)
+
 
 class PuckPacket(object):
     '''
@@ -23,7 +84,8 @@ class PuckPacket(object):
     linear_acceleration : numpy array
         The x, y, and z linear acceleration values of this puck
     quaternion : numpy array
-        The w, x, y, and z quaternion values of this
+        The w, x, y, and z quaternion values of this puck as contiguous
+        float32 values aligned to QUATERNION_ALIGNMENT bytes
     roll_pitch_yaw : numpy array
         The calculated roll, pitch, and yaw angles of this puck
     load cell : int
@@ -50,8 +112,6 @@ class PuckPacket(object):
     -------
     __init__()
         Initializes all data storage variables to default values
-    create_packet_definition()
-        Defines the incoming format of the data message
     parse(raw_data)
         Separates the incoming data into the right data variables
     parse_status(status)
@@ -66,6 +126,10 @@ class PuckPacket(object):
         Finds angle between the rotated y unit vector and the global xy plane
     getZAngle()
         Finds angle between the rotated z unit vector and the global xy plane
+    as_row()
+        Gathers the logged data of this puck into one float32 row
+    plot_row()
+        Copies the values this puck adds to each data plot
     __str__()
         Printed string of data variables when the class is printed
     '''
@@ -73,16 +137,18 @@ class PuckPacket(object):
         '''
         Initializes all data storage variables to default values
 
-        Sets all data variables to 0 and sets up the definition of the data
-        packet.
+        Sets all data variables to 0. The sensor arrays are allocated once
+        here and are written into in place by parse.
         '''
-        self.rotational_accelerometer = np.array([0, 0, 0])
-        self.gyroscope = np.array([0, 0, 0])
-        self.magnetometer = np.array([0.0, 0.0, 0.0])
+        self.rotational_accelerometer = np.zeros(3)
+        self.gyroscope = np.zeros(3)
+        self.magnetometer = np.zeros(3)
         # only updates if activated when puck connected to.
-        self.linear_acceleration = np.array([0, 0, 0])
-        self.quaternion = np.array([0.0, 0.0, 0.0, 0.0])
-        self.roll_pitch_yaw = np.array([0, 0, 0])
+        self.linear_acceleration = np.zeros(3)
+        # the quaternion must stay a contiguous, aligned float32 array and
+        # only ever be written into in place so compiled code can rely on it
+        self.quaternion = _aligned_zeros(4)
+        self.roll_pitch_yaw = np.zeros(3)
         self.load_cell = 0
         self.battery = 0
         self.charging = 0
@@ -92,30 +158,12 @@ class PuckPacket(object):
         self.linear_acceleration_measured = 0
         self.state = 0
         self.res_v5 = 0
-
-        self.packet_def = self.create_packet_definition()
-
-    def create_packet_definition(self) -> str:
-        '''
-        Defines the incoming format of the data message
-
-        Defines what each part of the byte array data message will be for. The
-        letters represent the format for each byte in the data message array.
-
-        Returns
-        -------
-        str
-            The assembled data message format
-        '''
-        rotational_accelerometer = "hhh"  # three shorts
-        gyroscope = "hhh"  # three shorts
-        magnetometer = "hhh"  # three shorts
-        quaternion = "hhhh"  # four shorts
-        load_cell = "h"  # one short
-        battery = "B"  # one char
-        status = "B"  # one char
-        return "<" + rotational_accelerometer + gyroscope + magnetometer +\
-            quaternion + load_cell + battery + status
+        # quaternion bytes of the last parsed packet
+        self._last_quaternion_bytes = b''
+        # status values written by the compiled parser
+        self._status = np.zeros(6, dtype=np.int32)
+        # reused row of the logged data returned by as_row
+        self._row = np.zeros(ROW_LENGTH, dtype=np.float32)
 
     def parse(self, raw_data: bytearray) -> None:
         '''
@@ -130,41 +178,53 @@ class PuckPacket(object):
         raw_data : bytearray
             The incoming data message from the puck
         '''
-        # Read the data based on the packet format
-        data = struct.unpack(self.packet_def, raw_data)
+        # parse the whole packet, status, and angles in one native call
+        if _parse_packet is not None:
+            self.load_cell = _parse_packet(
+                raw_data, self.gyroscope, self.rotational_accelerometer,
+                self.magnetometer, self.linear_acceleration, self.quaternion,
+                self.roll_pitch_yaw, self._status)
+            self.battery = raw_data[BATTERY_INDEX]
+            (self.connected, self.imu_ok, self.touch,
+             self.linear_acceleration_measured, self.state,
+             self.res_v5) = self._status.tolist()
+            return
+
+        # View the shorts of the packet in place instead of unpacking them
+        # into a tuple of python ints
+        data = np.frombuffer(raw_data, dtype='<i2', count=SHORTS_PER_PACKET)
 
         # Save the data from the packet into the data variables
-        self.gyroscope[0:3] = data[0:3]
-        self.rotational_accelerometer[0:3] = data[3:6]
-        # This is either the linear acceleration or magnetometer based on what
-        # the puck was asked for
-        vel_or_mag = data[6:9]
-
-        self.quaternion[0:4] = data[9:13]
-        # the quaternions from the puck are multiplied by 10000 to convert
-        # their float value to an int16 so this must be converted back
-        self.quaternion /= 10000.0
-
-        self.load_cell = data[13]
-        self.battery = data[14]
+        self.gyroscope[:] = data[0:3]
+        self.rotational_accelerometer[:] = data[3:6]
+
+        # the quaternion and the angles from it only need to be updated if
+        # the quaternion changed since the last packet
+        quaternion_bytes = raw_data[QUATERNION_BYTES]
+        quaternion_changed = quaternion_bytes != self._last_quaternion_bytes
+        if quaternion_changed:
+            self._last_quaternion_bytes = bytes(quaternion_bytes)
+            # the quaternions from the puck are multiplied by 10000 to convert
+            # their float value to an int16 so this must be converted back
+            np.multiply(data[9:13], 1e-4, out=self.quaternion)
+
+        self.load_cell = int(data[13])
+        self.battery = raw_data[BATTERY_INDEX]
         # takes the last char and separates it further
-        self.parse_status(data[15])
+        self.parse_status(raw_data[STATUS_INDEX])
 
         # if linear acceleration polling is enabled, update
-        # linear_acceleration. else update magnetometer
+        # linear_acceleration. else update magnetometer. Data 6 to 9 is
+        # either the linear acceleration or magnetometer based on what the
+        # puck was asked for
         if (self.linear_acceleration_measured):
-            self.linear_acceleration[0:3] = vel_or_mag
+            self.linear_acceleration[:] = data[6:9]
         else:
-            self.magnetometer[0:3] = vel_or_mag
-            self.magnetometer /= 100.0
+            np.multiply(data[6:9], 1e-2, out=self.magnetometer)
 
-        # calculate the roll, pitch, and yaw values. Needs to be in a try catch
-        # because the yellow puck does not do this correctly
-        try:
-            # gets the roll, pitch and yaw angles from quaternion
-            self.roll_pitch_yaw[0:3] = self.getRollPitchYaw()
-        except Exception:
-            pass
+        # calculate the roll, pitch, and yaw values
+        if quaternion_changed:
+            self.getRollPitchYaw()
 
     def parse_status(self, status: int) -> None:
         '''
@@ -191,24 +251,24 @@ class PuckPacket(object):
         '''
         Gets the roll, pitch, and yaw angles from quaternion constants
         '''
-        q0 = self.quaternion[0]
-        q1 = self.quaternion[1]
-        q2 = self.quaternion[2]
-        q3 = self.quaternion[3]
+        q0, q1, q2, q3 = self.quaternion.tolist()
 
-        # roll
-        self.roll_pitch_yaw[0] =\
-            -np.arcsin(2.0 * (q1 * q3 - q0 * q2))*180.0/np.pi
+        # roll. The yellow puck's quaternion is not always normalized, so the
+        # sine is clamped to the domain of arcsin
+        sin_roll = 2.0 * (q1 * q3 - q0 * q2)
+        sin_roll = -1.0 if sin_roll < -1.0 else\
+            (1.0 if sin_roll > 1.0 else sin_roll)
+        self.roll_pitch_yaw[0] = -math.asin(sin_roll) * _RAD2DEG
 
         # pitch
         self.roll_pitch_yaw[1] =\
-            np.arctan2(2.0 * (q0 * q1 + q2 * q3),
-                       q0 * q0 - q1 * q1 - q2 * q2 + q3 * q3) * 180.0 / np.pi
+            math.atan2(2.0 * (q0 * q1 + q2 * q3),
+                       q0 * q0 - q1 * q1 - q2 * q2 + q3 * q3) * _RAD2DEG
 
         # yaw
         self.roll_pitch_yaw[2] =\
-            np.arctan2(2.0 * (q1 * q2 + q0 * q3),
-                       q0 * q0 + q1 * q1 - q2 * q2 - q3 * q3) * 180.0 / np.pi
+            math.atan2(2.0 * (q1 * q2 + q0 * q3),
+                       q0 * q0 + q1 * q1 - q2 * q2 - q3 * q3) * _RAD2DEG
 
     def getAngle(self, v: np.ndarray) -> float:
         '''
@@ -250,8 +310,7 @@ class PuckPacket(object):
             The angle between the rotated x axis and the xy plane. Above the
             plane is positive and below is negative.
         '''
-        x_axis = np.array([0.0, 0.0, 1.0])
-        return self.getAngle(x_axis)
+        return self.getAngle(_X_AXIS)
 
     def getYAngle(self) -> float:
         '''
@@ -263,8 +322,7 @@ class PuckPacket(object):
             The angle between the rotated y axis and the xy plane. Above the
             plane is positive and below is negative.
         '''
-        y_axis = np.array([0.0, 0.0, 1.0])
-        return self.getAngle(y_axis)
+        return self.getAngle(_Y_AXIS)
 
     def getZAngle(self) -> float:
         '''
@@ -276,8 +334,50 @@ class PuckPacket(object):
             The angle between the rotated z axis and the xy plane. Above the
             plane is positive and below is negative.
         '''
-        z_axis = np.array([0.0, 0.0, 1.0])
-        return self.getAngle(z_axis)
+        return self.getAngle(_Z_AXIS)
+
+    def as_row(self) -> np.ndarray:
+        '''
+        Gathers the logged data of this puck into one float32 row
+
+        The row is allocated once and reused, so it is overwritten by the next
+        call. Copy it if it needs to be kept.
+
+        Returns
+        -------
+        numpy array
+            The rotational accelerometer (0 to 3), gyroscope (3 to 6), linear
+            acceleration (6 to 9), load cell (9), and quaternion (10 to 14)
+            values of this puck
+        '''
+        row = self._row
+        row[0:3] = self.rotational_accelerometer
+        row[3:6] = self.gyroscope
+        row[6:9] = self.linear_acceleration
+        row[9] = self.load_cell
+        row[10:14] = self.quaternion
+        return row
+
+    def plot_row(self) -> np.ndarray:
+        '''
+        Copies the values this puck adds to each data plot
+
+        Unlike as_row, a new array is returned each call so it can be handed
+        to another thread.
+
+        Returns
+        -------
+        numpy array
+            The roll, pitch, yaw, gyroscope, rotational acceleration, linear
+            acceleration, and load cell values in the order of the data plots
+            of the plotting tools
+        '''
+        # gathered straight into one float32 array instead of converting a
+        # float64 copy afterwards
+        return np.concatenate((self.roll_pitch_yaw, self.gyroscope,
+                               self.rotational_accelerometer,
+                               self.linear_acceleration, [self.load_cell]),
+                              dtype=np.float32)
 
     def __str__(self) -> str:
         '''
@@ -288,14 +388,15 @@ class PuckPacket(object):
 
         Returns
         -------
-        output_string : str
+        str
             The extracted data with labels
         '''
-        output_string = (self.rotational_accelerometer, self.gyroscope,
-                         self.magnetometer, self.quaternion, self.load_cell,
-                         self.battery, self.charging, self.connected,
-                         self.touch, self.imu_ok)
-        return "rotational accelerometer: %s, gyroscope: %s, magnetometer: %s,\
-            linear acceleration: %s, quaternion: %s, load cell: %s,\
-            battery: %s, charging: %s, connected: %s, touch: %s,\
-            imu ok: %s" % output_string
+        return (f"rotational accelerometer: "
+                f"{self.rotational_accelerometer}, "
+                f"gyroscope: {self.gyroscope}, "
+                f"magnetometer: {self.magnetometer}, "
+                f"linear acceleration: {self.linear_acceleration}, "
+                f"quaternion: {self.quaternion}, "
+                f"load cell: {self.load_cell}, battery: {self.battery}, "
+                f"charging: {self.charging}, connected: {self.connected}, "
+                f"touch: {self.touch}, imu ok: {self.imu_ok}")
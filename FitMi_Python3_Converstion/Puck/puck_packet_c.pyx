@@ -0,0 +1,117 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+# cython: cdivision=True
+'''
+Compiled parser for the data packets of the FitMi pucks
+
+Does the work of PuckPacket.parse, parse_status, and getRollPitchYaw in one
+call so a packet only crosses from Python into native code once. PuckPacket
+falls back to its NumPy parser if this module has not been built.
+
+Functions
+---------
+parse_packet(raw, gyro, accel, mag, vel, quat, rpy, status_out)
+    Parses one puck's data packet into the given arrays
+'''
+from libc.math cimport asin, atan2, M_PI
+from libc.stdint cimport int16_t
+
+# number of shorts at the start of the data packet and the index of the status
+# char after them
+DEF SHORTS_PER_PACKET = 14
+DEF STATUS_INDEX = 29
+
+
+cdef inline int16_t read_short(const unsigned char[::1] raw, Py_ssize_t i):
+    # read the little endian short i of the packet regardless of the host's
+    # byte order
+    return <int16_t>(raw[2 * i] | (raw[2 * i + 1] << 8))
+
+
+cpdef int parse_packet(const unsigned char[::1] raw, double[::1] gyro,
+                       double[::1] accel, double[::1] mag, double[::1] vel,
+                       float[::1] quat, double[::1] rpy,
+                       int[::1] status_out) except? -1:
+    '''
+    Parses one puck's data packet into the given arrays
+
+    Parameters
+    ----------
+    raw : bytearray
+        The incoming data message from the puck
+    gyro : numpy array
+        Output for the x, y, and z gyroscope values
+    accel : numpy array
+        Output for the x, y, and z rotational accelerometer values
+    mag : numpy array
+        Output for the x, y, and z magnetometer values. Only written when
+        the linear acceleration was not measured
+    vel : numpy array
+        Output for the x, y, and z linear acceleration values. Only written
+        when the linear acceleration was measured
+    quat : numpy array
+        Output for the w, x, y, and z float32 quaternion values
+    rpy : numpy array
+        Output for the roll, pitch, and yaw angles in degrees
+    status_out : numpy array
+        Output for the connected, imu ok, touch, linear acceleration
+        measured, state, and res_v5 status values as int32
+
+    Returns
+    -------
+    int
+        The load cell value of the packet
+    '''
+    cdef Py_ssize_t i
+    cdef unsigned char status
+    cdef double q0, q1, q2, q3, sin_roll
+
+    if raw.shape[0] <= STATUS_INDEX:
+        raise ValueError("puck data packet is too short")
+
+    # Save the data from the packet into the data variables
+    for i in range(3):
+        gyro[i] = read_short(raw, i)
+        accel[i] = read_short(raw, 3 + i)
+
+    # the quaternions from the puck are multiplied by 10000 to convert their
+    # float value to an int16 so this must be converted back
+    for i in range(4):
+        quat[i] = read_short(raw, 9 + i) * 1e-4
+
+    # takes the last char and separates it further
+    status = raw[STATUS_INDEX]
+    status_out[0] = status & 0b00000001
+    status_out[1] = (status & 0b00000010) >> 1
+    status_out[2] = (status & 0b00000100) >> 2
+    status_out[3] = (status & 0b00001000) >> 3
+    status_out[4] = (status & 0b01110000) >> 4
+    status_out[5] = (status & 0b10000000) >> 7
+
+    # shorts 6 to 9 are either the linear acceleration or magnetometer based
+    # on what the puck was asked for
+    if status_out[3]:
+        for i in range(3):
+            vel[i] = read_short(raw, 6 + i)
+    else:
+        for i in range(3):
+            mag[i] = read_short(raw, 6 + i) * 1e-2
+
+    # calculate the roll, pitch, and yaw angles from the quaternion
+    q0 = quat[0]
+    q1 = quat[1]
+    q2 = quat[2]
+    q3 = quat[3]
+    # the sine of the roll is clamped to the domain of asin since the yellow
+    # puck's quaternion is not always normalized
+    sin_roll = 2.0 * (q1 * q3 - q0 * q2)
+    if sin_roll < -1.0:
+        sin_roll = -1.0
+    elif sin_roll > 1.0:
+        sin_roll = 1.0
+    rpy[0] = -asin(sin_roll) * 180.0 / M_PI
+    rpy[1] = atan2(2.0 * (q0 * q1 + q2 * q3),
+                   q0 * q0 - q1 * q1 - q2 * q2 + q3 * q3) * 180.0 / M_PI
+    rpy[2] = atan2(2.0 * (q1 * q2 + q0 * q3),
+                   q0 * q0 + q1 * q1 - q2 * q2 - q3 * q3) * 180.0 / M_PI
+
+    return read_short(raw, SHORTS_PER_PACKET - 1)
@@ -71,25 +71,22 @@ class PuckTask(object):
             Returns if the state has switched values. True is it changed from
             False to True
         '''
-        # if the state is already true, this method does not need to run
-        if self.state:
-            return
-
         # get the desired degree of freedom's angle
         pos = puck.puck_1_packet.roll_pitch_yaw[self.dof]
 
-        # if the angle does not exist, return nothing
-        if not pos:
-            return
+        # if the angle does not exist, nothing changed. NaN is the only value
+        # not equal to itself, so this does not drop level (0.0) readings
+        if pos != pos:
+            return False
 
-        # switch the state's value if the degree of freedom is below the
-        # negative of the target
-        if (pos - self.angle_reference) < -self.target:
-            self.state = True
+        # switch the state's value if it is false and the degree of freedom is
+        # below the negative of the target
+        trigger = (not self.state) and\
+            (pos - self.angle_reference) < -self.target
+        self.state = self.state or trigger
 
-        # return the state value as if it was true, the value switched and if
-        # its false, nothing changed.
-        return self.state
+        # return if the value switched on this call
+        return trigger
 
     def checkStateBTrigger(self, puck: HIDPuckDongle) -> bool:
         '''
@@ -111,22 +108,19 @@ class PuckTask(object):
             Returns if the state has switched values. True is it changed from
             True to False
         '''
-        # if the state is already false, this method does not need to run
-        if not self.state:
-            return
-
         # get the desired degree of freedom's angle
         pos = puck.puck_1_packet.roll_pitch_yaw[self.dof]
 
-        # if the angle does not exist, return nothing
-        if not pos:
-            return
+        # if the angle does not exist, nothing changed. NaN is the only value
+        # not equal to itself, so this does not drop level (0.0) readings
+        if pos != pos:
+            return False
 
-        # switch the state's value if the degree of freedom is above the the
-        # target value
-        if (pos - self.angle_reference) > self.target:
-            self.state = False
+        # switch the state's value if it is true and the degree of freedom is
+        # above the the target value
+        trigger = self.state and\
+            (pos - self.angle_reference) > self.target
+        self.state = self.state and not trigger
 
-        # return the opposite of the state value as if it was false, the value
-        # switched and if its true, nothing changed.
-        return not self.state
+        # return if the value switched on this call
+        return trigger
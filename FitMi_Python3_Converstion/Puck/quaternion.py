@@ -14,6 +14,8 @@ q_conjugate(q):
     Get the conjugate of a quaternion
 q_rotate_vector(q, v)
     Use a quaternion to rotate a vector
+q_rotation_matrix(q)
+    Get the matrix that rotates vectors like a quaternion
 '''
 import numpy as np
 
@@ -109,6 +111,45 @@ def q_rotate_vector(q: np.ndarray, v: np.ndarray) -> np.ndarray:
     return q_multiply(q_multiply(q, q_v), q_conjugate(q))[1:]
 
 
+def q_rotation_matrix(q: np.ndarray) -> np.ndarray:
+    '''
+    Get the matrix that rotates vectors like a quaternion
+
+    Multiplying a vector by the matrix gives the same vector as
+    q_rotate_vector, so the columns of the matrix are the x, y, and z unit
+    vectors rotated by the quaternion. The quaternion is not normalized first
+    to match q_rotate_vector. An array of quaternions, such as the quaternions
+    of a log file, gives a matrix for each of them in one pass.
+
+    Parameters
+    ----------
+    q : numpy array
+        An input quaternion, or an array of quaternions with the w, x, y, and
+        z values along its last axis
+
+    Returns
+    -------
+    numpy array
+        The 3x3 rotation matrix of the quaternion, or an array of them with
+        the leading shape of the input
+    '''
+    q = np.asarray(q)
+    w, x, y, z = np.moveaxis(q, -1, 0)
+    ww, xx, yy, zz = w * w, x * x, y * y, z * z
+
+    matrix = np.empty(q.shape[:-1] + (3, 3))
+    matrix[..., 0, 0] = ww + xx - yy - zz
+    matrix[..., 0, 1] = 2 * (x * y - w * z)
+    matrix[..., 0, 2] = 2 * (x * z + w * y)
+    matrix[..., 1, 0] = 2 * (x * y + w * z)
+    matrix[..., 1, 1] = ww - xx + yy - zz
+    matrix[..., 1, 2] = 2 * (y * z - w * x)
+    matrix[..., 2, 0] = 2 * (x * z - w * y)
+    matrix[..., 2, 1] = 2 * (y * z + w * x)
+    matrix[..., 2, 2] = ww - xx - yy + zz
+    return matrix
+
+
 if __name__ == "__main__":
     '''
     Demonstrate quaternion rotation by rotating a unit vector along the z axis
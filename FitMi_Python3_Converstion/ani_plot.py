@@ -1,4 +1,6 @@
 from matplotlib import pyplot as plt
+from matplotlib.collections import LineCollection
+import numpy as np
 from typing import List
 from Puck.puck_packet import PuckPacket
 
@@ -17,33 +19,71 @@ class AniPlot(object):
     ax : matplotlib.pyplot.axis
         Axis of the subplot
     bg : plot region
-        Copy of the subplot region
-    puck_0_data : List[int]
-        List of 0's the length of the buffer for the blue puck's data
-    puck_1_data : List[int]
-        List of 0's the length of the buffer for the yellow puck's data
+        Copy of the subplot region. None until the figure is first drawn
+    puck_0_data : numpy array
+        Ring buffer of 0's the length of the buffer for the blue puck's data
+    puck_1_data : numpy array
+        Ring buffer of 0's the length of the buffer for the yellow puck's data
+    index : int
+        Index of the oldest point in the ring buffers, which is where the next
+        point is written
+    x_points : numpy array
+        x values of the data plot
+    display_index : numpy array
+        Indices of the unrolled buffers that are drawn when the buffers are
+        longer than the max display points. None if every point is drawn
+    unroll : method
+        unroll_buffer, or unroll_decimated_buffer if the buffers are
+        decimated
+    draw_lines : method
+        Draws the data onto the subplot without showing it. It is
+        draw_one_puck or draw_two_pucks based on how many pucks are plotted so
+        drawing does not check for the second puck on every frame
+    y_points : List[numpy array]
+        Views of the y values of each puck's line
+    colors : List[str]
+        Color of each puck's line
+    lines : matplotlib.collections.LineCollection
+        The lines of every plotted puck drawn as a single artist
 
     Methods
     -------
-    __init__(fig, split, buffer_min, buffer_max, ymin, ymax, second_puck)
+    __init__(fig, split, buffer_min, buffer_max, ymin, ymax, second_puck,
+             max_display_points)
         Create the base data subplot
     set_xlabel
         Sets the x axis label of the subplot
     set_ylabel
         Sets the y axis label of the subplot
+    set_color(puck, color)
+        Sets the color of one puck's line
+    on_draw(event)
+        Copies the subplot region after the figure is fully redrawn
+    set_buffers(puck_0_data, puck_1_data)
+        Uses the given arrays as the ring buffers of the plot
     update(puck_0_data, puck_1_data):
         Add the new data to the end of the buffer of data
-    draw(fig):
-        Adds the data to the subplot
+    unroll_buffer(buffer, y_points)
+        Copies a ring buffer into a line's y values, oldest point first
+    unroll_decimated_buffer(buffer, y_points)
+        Copies the displayed points of a ring buffer into a line's y values
+    draw(fig)
+        Adds the data to the subplot and shows it
+    draw_one_puck(index)
+        Draws the blue puck's data onto the subplot without showing it
+    draw_two_pucks(index)
+        Draws both pucks' data onto the subplot without showing it
     '''
     def __init__(self, fig: plt.figure, split: List[int], buffer_min: int = 0,
                  buffer_max: int = 200, ymin: int = -180, ymax: int = 180,
-                 second_puck: bool = False) -> None:
+                 second_puck: bool = False,
+                 max_display_points: int = None) -> None:
         '''
         Create the base data subplot
 
         Create the subplot for the data with a buffer of base line values
-        before the data gets updated.
+        before the data gets updated. The figure has to be drawn once after
+        all of its plots are created and before they are animated with draw.
 
         Parameters
         ----------
@@ -61,6 +101,9 @@ class AniPlot(object):
             top of the y axis
         second_puck : bool, default = False
             Indicates if you want to plot the second puck's data (True = yes)
+        max_display_points : int, optional
+            The most points drawn per line. Longer buffers are drawn with
+            evenly spaced points from the buffer. All points are drawn if None
         '''
         self.fig = fig  # moves the data figure a class attribute
         # create the subplot based on input parameters for the plot number and
@@ -69,36 +112,75 @@ class AniPlot(object):
                                   xlim=(buffer_min, buffer_max),
                                   ylim=(ymin, ymax))
 
-        # display the figure and update it
+        # display the figure. It is not drawn here so a figure of many plots
+        # is drawn once after all of them are created instead of once per
+        # plot. The subplot region is copied by on_draw when it is drawn
         fig.show(False)
-        fig.canvas.draw()
-
-        # copy the subplot region
-        self.bg = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        self.bg = None
 
         # create the base line for the blue puck and set the puck puck's line
-        # to None
-        self.puck_0_data = [0]*(buffer_max - buffer_min)
+        # to None. The buffers are ring buffers where a new point overwrites
+        # the oldest one so nothing is shifted or allocated per sample
+        buffer_length = buffer_max - buffer_min
+        self.puck_0_data = np.zeros(buffer_length, dtype=np.float32)
         self.puck_1_data = None
+        self.index = 0
 
         # If you want to plot the second puck's data, create the base line for
         # the yellow puck
         if second_puck:
-            self.puck_1_data = [0]*(buffer_max - buffer_min)
+            self.puck_1_data = np.zeros(buffer_length, dtype=np.float32)
 
         # create the x values for the data plot
-        self.x_points = range(buffer_min, buffer_max)
+        self.x_points = np.arange(buffer_min, buffer_max)
+
+        # if the buffer is longer than the points that should be drawn, only
+        # draw evenly spaced points from it
+        self.display_index = None
+        if max_display_points and max_display_points < buffer_length:
+            self.display_index =\
+                np.linspace(0, buffer_length - 1,
+                            max_display_points).astype(np.int64)
+
+        # create the base lines of every plotted puck. Both lines are kept in
+        # one array so they are drawn as a single artist
+        if self.display_index is None:
+            display_x_points = self.x_points
+        else:
+            display_x_points = self.x_points[self.display_index]
+        segments = np.zeros((2 if second_puck else 1,
+                             len(display_x_points), 2))
+        segments[:, :, 0] = display_x_points
 
-        # plot the base line of the blue puck in blue
-        self.puck_1_plot = self.ax.plot(self.x_points, self.puck_0_data, '-',
-                                        color="b")[0]
-        self.puck_2_plot = None
+        # plot the blue puck in blue and if there is a need to plot a second
+        # puck, plot the yellow puck in green. The lines are only drawn by
+        # blitting in draw, so they are animated to keep them out of full
+        # canvas draws and not anti-aliased to cut the cost of rasterizing
+        # them on every frame
+        self.colors = ["b", "g"][:len(segments)]
+        self.lines = LineCollection(segments, colors=self.colors,
+                                    linestyles='-', animated=True,
+                                    antialiased=False)
+        self.ax.add_collection(self.lines, autolim=False)
 
-        # if there is a need to plot a second puck, plot the yellow puck in
-        # green
+        # keep views of the y values of the lines so draw only writes the new
+        # y values and the x values, which never change, are set only once
+        self.y_points = [path.vertices[:, 1]
+                         for path in self.lines.get_paths()]
+
+        # pick the unrolling and drawing methods once based on the plot's setup
+        if self.display_index is None:
+            self.unroll = self.unroll_buffer
+        else:
+            self.unroll = self.unroll_decimated_buffer
         if second_puck:
-            self.puck_2_plot = self.ax.plot(self.x_points, self.puck_1_data,
-                                            '-', color="g")[0]
+            self.draw_lines = self.draw_two_pucks
+        else:
+            self.draw_lines = self.draw_one_puck
+
+        # copy the subplot region again whenever the figure is fully redrawn,
+        # such as after a resize or a label change
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
 
     def set_xlabel(self, axis_name: str) -> None:
         '''
@@ -109,9 +191,10 @@ class AniPlot(object):
         axis_name : string
             The label for the x axis
         '''
-        # set the x axis label with a font size of 12 and redraw the figure
+        # set the x axis label with a font size of 12. The redraw is
+        # deferred so setting many labels only redraws the figure once
         self.ax.set_xlabel(axis_name, fontsize=12)
-        self.fig.canvas.draw()
+        self.fig.canvas.draw_idle()
 
     def set_ylabel(self, axis_name: str) -> None:
         '''
@@ -122,17 +205,74 @@ class AniPlot(object):
         axis_name : string
             The label for the y axis
         '''
-        # set the y axis label with a font size of 12 and redraw the figure
+        # set the y axis label with a font size of 12. The redraw is
+        # deferred so setting many labels only redraws the figure once
         self.ax.set_ylabel(axis_name, fontsize=12)
-        self.fig.canvas.draw()
+        self.fig.canvas.draw_idle()
+
+    def set_color(self, puck: int, color: str) -> None:
+        '''
+        Sets the color of one puck's line
+
+        Parameters
+        ----------
+        puck : int
+            The puck whose line is changed (0 = blue puck, 1 = yellow puck)
+        color : str
+            The new color of the puck's line
+        '''
+        # only update the collection if the puck is plotted and its color
+        # changed
+        if puck < len(self.colors) and self.colors[puck] != color:
+            self.colors[puck] = color
+            self.lines.set_color(self.colors)
+
+    def on_draw(self, event) -> None:
+        '''
+        Copies the subplot region after the figure is fully redrawn
+
+        A full redraw leaves out the animated lines and may move the subplot,
+        so the background used for blitting is copied again and the lines are
+        drawn back on top of it.
+
+        Parameters
+        ----------
+        event : matplotlib.backend_bases.DrawEvent
+            The draw event of the figure's canvas
+        '''
+        self.bg = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.lines)
+
+    def set_buffers(self, puck_0_data: np.ndarray,
+                    puck_1_data: np.ndarray = None) -> None:
+        '''
+        Uses the given arrays as the ring buffers of the plot
+
+        Lets a figure of many plots keep all of their data in one array per
+        puck so a sample is added to every plot with one write. The owner of
+        the arrays then passes the index of their oldest point to draw_lines.
+
+        Parameters
+        ----------
+        puck_0_data : numpy array
+            Ring buffer for the blue puck's data. It must be as long as the
+            plot's buffer
+        puck_1_data : numpy array, optional
+            Ring buffer for the yellow puck's data. Only used if the yellow
+            puck is plotted
+        '''
+        self.puck_0_data = puck_0_data
+        if self.puck_1_data is not None:
+            self.puck_1_data = puck_1_data
+        self.index = 0
 
     def update(self, puck_0_data: PuckPacket,
                puck_1_data: PuckPacket = None) -> None:
         '''
         Add the new data to the end of the buffer of data
 
-        Adds new data to the end of the data buffer and removes the first point
-        in the buffer.
+        Overwrites the first point in the data buffer with the new data and
+        moves the end of the buffer to it.
 
         Parameters
         ----------
@@ -141,20 +281,50 @@ class AniPlot(object):
         puck_1_data : int
             new data from the yellow puck
         '''
-        # adds data to the end of the blue puck buffer and removes the first
-        # point
-        self.puck_0_data.pop(0)
-        self.puck_0_data.append(puck_0_data)
+        # replaces the first point of the blue puck buffer with the data
+        self.puck_0_data[self.index] = puck_0_data
 
-        # if you want to track two pucks, adds data to the end of the yellow
-        # puck buffer and removes the first point
+        # if you want to track two pucks, replaces the first point of the
+        # yellow puck buffer with the data
         if (puck_1_data is not None) and (self.puck_1_data is not None):
-            self.puck_1_data.pop(0)
-            self.puck_1_data.append(puck_1_data)
+            self.puck_1_data[self.index] = puck_1_data
+
+        # the next point is now the first point of the buffers
+        self.index = (self.index + 1) % len(self.puck_0_data)
+
+    def unroll_buffer(self, buffer: np.ndarray,
+                      y_points: np.ndarray) -> None:
+        '''
+        Copies a ring buffer into a line's y values, oldest point first
+
+        Parameters
+        ----------
+        buffer : numpy array
+            One puck's ring buffer of data
+        y_points : numpy array
+            The y values of the puck's line
+        '''
+        split = len(buffer) - self.index
+        y_points[:split] = buffer[self.index:]
+        y_points[split:] = buffer[:self.index]
+
+    def unroll_decimated_buffer(self, buffer: np.ndarray,
+                                y_points: np.ndarray) -> None:
+        '''
+        Copies the displayed points of a ring buffer into a line's y values
+
+        Parameters
+        ----------
+        buffer : numpy array
+            One puck's ring buffer of data
+        y_points : numpy array
+            The y values of the puck's line
+        '''
+        y_points[:] = buffer[(self.display_index + self.index) % len(buffer)]
 
     def draw(self, fig: plt.figure) -> None:
         '''
-        Adds the data to the subplot
+        Adds the data to the subplot and shows it
 
         Adds the data from the data buffers to the plot and redraws it for the
         animation.
@@ -164,15 +334,52 @@ class AniPlot(object):
         fig : matplotlib.pyplot.figure
             Figure for all of the data plots
         '''
-        # adds data from the pucks to the plot
-        self.puck_1_plot.set_data(self.x_points, self.puck_0_data)
-        if self.puck_2_plot and self.puck_1_data:
-            self.puck_2_plot.set_data(self.x_points, self.puck_1_data)
+        self.draw_lines()
+        fig.canvas.blit(self.ax.bbox)
 
-        # redraw the figure
-        fig.canvas.restore_region(self.bg)
-        self.ax.draw_artist(self.puck_1_plot)
-        if self.puck_2_plot:
-            self.ax.draw_artist(self.puck_2_plot)
+    def draw_one_puck(self, index: int = None) -> None:
+        '''
+        Draws the blue puck's data onto the subplot without showing it
 
-        fig.canvas.blit(self.ax.bbox)
+        The subplot is shown the next time its region of the canvas is
+        blitted, so a figure of many plots can show all of them at once.
+
+        Parameters
+        ----------
+        index : int, optional
+            Index of the oldest point in ring buffers given by set_buffers.
+            The plot's own index is used if None
+        '''
+        if index is not None:
+            self.index = index
+
+        # adds data from the puck to the plot
+        self.unroll(self.puck_0_data, self.y_points[0])
+
+        # redraw the subplot
+        self.fig.canvas.restore_region(self.bg)
+        self.ax.draw_artist(self.lines)
+
+    def draw_two_pucks(self, index: int = None) -> None:
+        '''
+        Draws both pucks' data onto the subplot without showing it
+
+        The subplot is shown the next time its region of the canvas is
+        blitted, so a figure of many plots can show all of them at once.
+
+        Parameters
+        ----------
+        index : int, optional
+            Index of the oldest point in ring buffers given by set_buffers.
+            The plot's own index is used if None
+        '''
+        if index is not None:
+            self.index = index
+
+        # adds data from the pucks to the plot
+        self.unroll(self.puck_0_data, self.y_points[0])
+        self.unroll(self.puck_1_data, self.y_points[1])
+
+        # redraw the subplot
+        self.fig.canvas.restore_region(self.bg)
+        self.ax.draw_artist(self.lines)
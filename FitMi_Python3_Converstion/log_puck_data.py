@@ -1,5 +1,10 @@
+import ctypes
 import os
-import shelve
+import platform
+import queue
+import selectors
+import signal
+import sys
 import numpy as np
 from scipy import io
 import threading
@@ -7,15 +12,145 @@ import time
 from Puck.hid_puck import HIDPuckDongle, SENDVEL
 from Puck.puck_packet import PuckPacket
 
+# msvcrt is used to check for enter being pressed on Windows, where the
+# console's input can not be watched with selectors
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# h5py is only needed to stream the data to a MATLAB v7.3 .mat file
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+# CPU the acquisition thread is pinned to, the real time priority it is given
+# on Linux, and the thread priority it is given on Windows
+ACQUISITION_CPU = 0
+ACQUISITION_FIFO_PRIORITY = 40
+THREAD_PRIORITY_TIME_CRITICAL = 15
+
+# Number of samples collected in the staging arrays before they are copied
+# into the data arrays together
+STAGE_SIZE = 64
+
+# Columns of the data and staging arrays for each of a puck's data types. These
+# match the row returned by PuckPacket.as_row
+ROTATIONAL_ACCELERATION_COLUMNS = slice(0, 3)
+GYROSCOPE_COLUMNS = slice(3, 6)
+LINEAR_ACCELERATION_COLUMNS = slice(6, 9)
+LOAD_CELL_COLUMNS = slice(9, 10)
+QUATERNION_COLUMNS = slice(10, 14)
+COLUMNS_PER_PUCK = 14
+
+# Data type of the logged data
+DATA_TYPE = np.float32
+
+# Variables of the .mat file as their name, the puck their data is from, and
+# the puck's columns of data they hold
+MAT_VARIABLES = (
+    ("puck_0_rotational_acceleration", 0, ROTATIONAL_ACCELERATION_COLUMNS),
+    ("p0_gyroscope", 0, GYROSCOPE_COLUMNS),
+    ("p0_linear_acceleration", 0, LINEAR_ACCELERATION_COLUMNS),
+    ("p0_load_cell", 0, LOAD_CELL_COLUMNS),
+    ("p0_quaternion", 0, QUATERNION_COLUMNS),
+    ("puck_1_rotational_acceleration", 1, ROTATIONAL_ACCELERATION_COLUMNS),
+    ("p1_gyroscope", 1, GYROSCOPE_COLUMNS),
+    ("p1_linear_acceleration", 1, LINEAR_ACCELERATION_COLUMNS),
+    ("p1_load_cell", 1, LOAD_CELL_COLUMNS),
+    ("p1_quaternion", 1, QUATERNION_COLUMNS))
+
+# Size of the header block at the start of a MATLAB v7.3 .mat file, the
+# number of samples in each chunk of a streamed variable, and the MATLAB class
+# name of each numpy data type
+MAT_HEADER_SIZE = 512
+MAT_CHUNK_SAMPLES = 1024
+MATLAB_CLASSES = {np.dtype(np.float32): "single",
+                  np.dtype(np.float64): "double"}
+
+
+def create_mat_v73(mat_path: str) -> "h5py.File":
+    '''
+    Creates a MATLAB v7.3 .mat file to stream data into
+
+    A v7.3 .mat file is an HDF5 file with a MATLAB header in front of it, so
+    the file is created with space reserved for the header. The header is
+    written by write_mat_header once the file is closed.
+
+    Parameters
+    ----------
+    mat_path:str
+        The path of the .mat file
+
+    Returns
+    -------
+    h5py.File
+        The open .mat file
+    '''
+    if h5py is None:
+        raise ImportError("h5py is needed to write MATLAB v7.3 .mat files")
+
+    return h5py.File(mat_path, "w", userblock_size=MAT_HEADER_SIZE)
+
+
+def write_mat_header(mat_path: str) -> None:
+    '''
+    Writes the MATLAB header into the block reserved at the start of the file
+
+    Parameters
+    ----------
+    mat_path:str
+        The path of the closed .mat file made by create_mat_v73
+    '''
+    header_text = ("MATLAB 7.3 MAT-file, Platform: %s, Created on: %s "
+                   "HDF5 schema 1.00 ." % (platform.system(),
+                                           time.strftime("%c")))
+    header = header_text.encode("ascii").ljust(116)[:116] +\
+        b"\x00" * 8 + b"\x00\x02" + b"IM"
+    with open(mat_path, "r+b") as mat_file:
+        mat_file.write(header)
+
+
+def prioritize_thread() -> None:
+    '''
+    Pins the calling thread to one CPU and raises its priority
+
+    Keeps the thread polling the pucks from being preempted by the plotting
+    or GUI threads so the samples stay evenly spaced. Real time scheduling is
+    only asked for when running as root. Anything the platform does not
+    support or allow is skipped and the thread keeps its normal scheduling.
+    '''
+    if platform.system() == "Windows":
+        try:
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(),
+                                       THREAD_PRIORITY_TIME_CRITICAL)
+        except (AttributeError, OSError):
+            pass
+        return
+
+    # on Linux, process id 0 means the calling thread
+    try:
+        os.sched_setaffinity(0, {ACQUISITION_CPU})
+    except (AttributeError, OSError):
+        pass
+    try:
+        if os.geteuid() == 0:
+            os.sched_setscheduler(
+                0, os.SCHED_FIFO, os.sched_param(ACQUISITION_FIFO_PRIORITY))
+    except (AttributeError, OSError):
+        pass
+
 
 class PuckLogger(object):
     '''
-    Saves puck data as a dictionary and .mat file
+    Saves puck data as a .mat file
 
     Saves the base data from each puck, the rotational acceleration,
-    gyroscope, linear acceleration, load cell, and quaternion, as a python
-    dictionary and then a .mat file. This class when run also allows you to
-    stop the recording early by pressing enter in the console.
+    gyroscope, linear acceleration, load cell, and quaternion, as a .mat
+    file. This class when run also allows you to
+    stop the recording early by pressing enter or ctrl+c in the console.
 
     Attributes
     ----------
@@ -26,55 +161,78 @@ class PuckLogger(object):
         The name of the log file
     samples_per_second:int
         The number os samples added to the data variables per second
+    stream_mat:bool
+        Streams the data into a compressed MATLAB v7.3 .mat file with h5py
+        while recording (True) instead of keeping it in memory and saving it
+        with scipy at the end (False)
+    prioritize_acquisition:bool
+        Pins the acquisition thread to a CPU and raises its priority so the
+        samples stay evenly spaced
     keep_running:bool
         Indicates if the recording should end early
     puck:HIDPuckDongle object
         Communication class with the FitMi dongle
     samples_taken:int
         Keeps a running total of the number of samples
+    samples_flushed:int
+        The number of samples copied from the staging arrays to the data
+        variables
     max_samples:int
         The total number of samples desired
-    puck_0_rotational_acceleration:List[int]
-        Data variable for the blue puck's rotational accelerometer values
-    puck_0_gyroscope:List[int]
-        Data variable for the blue puck's gyroscope values
-    puck_0_linear_acceleration:List[int]
-        Data variable for the blue puck's linear acceleration values
-    puck_0_load_cell:List[int]
-        Data variable for the blue puck's load cell value
-    puck_0_quaternion:List[int]
-        Data variable for the blue puck's quaternion values
-    puck_1_rotational_acceleration:List[int]
-        Data variable for the yellow puck's rotational accelerometer values
-    puck_1_gyroscope:List[int]
-        Data variable for the yellow puck's gyroscope values
-    puck_1_linear_acceleration:List[int]
-        Data variable for the yellow puck's linear acceleration values
-    puck_1_load_cell:List[int]
-        Data variable for the yellow puck's load cell value
-    puck_1_quaternion:List[int]
-        Data variable for the yellow puck's quaternion values
-    check_stop_thread:threading.Thread thread
-        Thread to check of the user has pressed enter to stop data collection
-    check_stop_thread.daemon:bool
-        Sets if the thread stops with the main function (True) or not
+    puck_0_data:numpy array
+        Data variable for the blue puck with one row per sample. The columns
+        are split into the data types by the module's column slices. None
+        when streaming
+    puck_1_data:numpy array
+        Data variable for the yellow puck with one row per sample. None when
+        streaming
+    puck_0_stage:numpy array
+        Staging array of the blue puck's most recent samples
+    puck_1_stage:numpy array
+        Staging array of the yellow puck's most recent samples
+    mat_file:h5py.File
+        The .mat file being streamed to. None when not streaming
+    mat_datasets:list
+        The streamed datasets of the .mat file as the dataset, the puck its
+        data is from, and the puck's columns of data it holds
+    stdin_selector:selectors.DefaultSelector
+        Watches the console's input for enter being pressed without blocking.
+        None when using the app, on Windows, or when stdin can not be watched
+    packet_queue:queue.SimpleQueue
+        Queue of the pucks' rows of logged data from the acquisition thread
+    acquisition_thread:threading.Thread thread
+        Thread polling the pucks at the sample rate
 
     Methods
     -------
     __init__()
         Initializes the variables needed to record into a log file
     check_stop()
-        Asks the user to press enter to stop recording.
+        Checks if the user pressed enter to stop recording without blocking
+    stop_logging(signal_number, frame)
+        Stops recording when the user presses ctrl+c
+    acquire_data()
+        Polls the pucks at the sample rate and queues their logged data
     run()
         Setup the length of recording and stores the data on each sample step.
     set_filename()
         Ask the user for the log file's name
     set_recording_length()
         Finds the total recording time and initializes the pucks' data arrays
+    allocate_data(max_samples)
+        Initializes the pucks' data and staging arrays for a new recording
+    open_mat_stream()
+        Creates the .mat file and its datasets to stream the data into
     store_data(puck_0_packet, puck_1_packet)
         Extracts each data type from the pucks total data.
+    store_rows(puck_0_row, puck_1_row)
+        Stages one sample of both pucks' logged data
+    flush_data()
+        Copies the staged samples into the data variables or .mat file
+    crop_data()
+        Trims the unused samples off the end of the data variables
     write_data()
-        Writes the logged data to a python dictionary and .mat file
+        Writes the logged data to a .mat file
     stop()
         Closes communication with the pucks and saves the log file data
     '''
@@ -84,7 +242,7 @@ class PuckLogger(object):
 
         Creates the path to where the log file will be stored, sets up what is
         needed to communicate and log all of the pucks' data into variables,
-        and sets up the thread looking to see if the user wants to stop
+        and sets up watching the console to see if the user wants to stop
         recording early.
 
         Parameters
@@ -96,40 +254,110 @@ class PuckLogger(object):
         self.file_name = "temp"
 
         self.samples_per_second = 50
+        self.stream_mat = False
+        self.prioritize_acquisition = True
         self.keep_running = True
         self.puck = HIDPuckDongle()
 
         self.samples_taken = 0
+        self.samples_flushed = 0
         self.max_samples = None
 
-        self.puck_0_rotational_acceleration = None
-        self.puck_0_gyroscope = None
-        self.puck_0_linear_acceleration = None
-        self.puck_0_load_cell = None
-        self.puck_0_quaternion = None
+        self.puck_0_data = None
+        self.puck_1_data = None
+
+        self.puck_0_stage = None
+        self.puck_1_stage = None
 
-        self.puck_1_rotational_acceleration = None
-        self.puck_1_gyroscope = None
-        self.puck_1_linear_acceleration = None
-        self.puck_1_load_cell = None
-        self.puck_1_quaternion = None
+        self.mat_file = None
+        self.mat_datasets = []
 
-        if not using_app:
-            self.check_stop_thread = threading.Thread(target=self.check_stop)
-            self.check_stop_thread.daemon = True
+        self.packet_queue = queue.SimpleQueue()
+        self.acquisition_thread = threading.Thread(target=self.acquire_data)
+        self.acquisition_thread.daemon = True
+
+        self.stdin_selector = None
+        if not using_app and msvcrt is None:
+            self.stdin_selector = selectors.DefaultSelector()
+            try:
+                self.stdin_selector.register(sys.stdin, selectors.EVENT_READ)
+            except (OSError, ValueError):
+                # stdin redirected from a file or /dev/null can not be
+                # watched, so ctrl+c is left to stop recording
+                self.stdin_selector.close()
+                self.stdin_selector = None
 
     def check_stop(self) -> None:
         '''
-        Asks the user to press enter to stop recording.
+        Checks if the user pressed enter to stop recording without blocking
 
-        Asks the user to press enter to stop logging data. The user can enter
-        anything they want into the console to stop recording. This is just a
-        thread that will change the check_stop_thread variable to False when it
-        completes.
+        The user can enter anything they want into the console to stop
+        recording. This is called once per sample, so it only checks if a line
+        was entered and never waits for one.
+        '''
+        if self.stdin_selector is not None:
+            if self.stdin_selector.select(timeout=0):
+                sys.stdin.readline()
+                self.keep_running = False
+        elif msvcrt is not None:
+            while msvcrt.kbhit():
+                if msvcrt.getwch() in "\r\n":
+                    self.keep_running = False
+
+    def stop_logging(self, signal_number: int, frame) -> None:
         '''
-        while self.keep_running:
-            _ = input("press enter to stop logging.")
-            self.keep_running = False
+        Stops recording when the user presses ctrl+c
+
+        Parameters
+        ----------
+        signal_number:int
+            The number of the received signal
+        frame:frame
+            The stack frame the signal interrupted
+        '''
+        self.keep_running = False
+
+    def acquire_data(self) -> None:
+        '''
+        Polls the pucks at the sample rate and queues their logged data
+
+        Runs on its own thread so polling keeps its timing when storing the
+        data or anything else on the main thread stalls. The packets are
+        updated in place by the dongle, so copies of their rows of logged data
+        are queued.
+        '''
+        if self.prioritize_acquisition:
+            prioritize_thread()
+
+        # Poll the pucks according to the sample rate. Each sample is
+        # scheduled a fixed period after the last one so the time spent
+        # polling does not add to the period and the sample rate does not
+        # drift
+        period = 1.0 / self.samples_per_second
+
+        # the dongle updates the same packets in place, so they and the
+        # methods called on every sample are looked up once
+        check_for_new_data = self.puck.checkForNewPuckData
+        puck_0_row = self.puck.puck_0_packet.as_row
+        puck_1_row = self.puck.puck_1_packet.as_row
+        put_rows = self.packet_queue.put
+
+        next_sample_time = time.monotonic()
+        for _ in range(self.max_samples):
+            if not self.keep_running:
+                break
+
+            check_for_new_data()
+            put_rows((puck_0_row().copy(), puck_1_row().copy()))
+
+            next_sample_time += period
+            sleep_time = next_sample_time - time.monotonic()
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+            else:
+                # fell behind, so schedule from now instead of rushing to
+                # catch up on the missed samples
+                next_sample_time = time.monotonic()
 
     def run(self) -> None:
         '''
@@ -143,46 +371,41 @@ class PuckLogger(object):
         # Set up how long to record and where to record to
         self.set_recording_length()
         self.set_filename()
+        if self.stream_mat:
+            self.open_mat_stream()
 
         # Start communication to each puck
         self.puck.open()
-        self.puck.send_command(0, SENDVEL, 0x00, 0x01)
-        self.puck.send_command(1, SENDVEL, 0x00, 0x01)
+        self.puck.send_commands([(0, SENDVEL, 0x00, 0x01),
+                                 (1, SENDVEL, 0x00, 0x01)])
 
         print("recording data")
-        # Start the thread looking for the recording to stop early
-        self.check_stop_thread.start()
-        self.samples_taken = 0
-
-        # Record data according to the sample rate
+        print("press enter or ctrl+c to stop logging.")
+        # Stop the recording early on ctrl+c instead of raising an error
+        previous_handler = signal.signal(signal.SIGINT, self.stop_logging)
+
+        # Poll the pucks on the acquisition thread and store the data as it
+        # comes in
+        self.acquisition_thread.start()
+        period = 1.0 / self.samples_per_second
         while self.keep_running and (self.samples_taken < self.max_samples):
-            self.puck.checkForNewPuckData()
-            self.store_data(self.puck.puck_0_packet, self.puck.puck_1_packet)
-            time.sleep(1.0/self.samples_per_second)
+            self.check_stop()
+            try:
+                puck_0_row, puck_1_row = self.packet_queue.get(timeout=period)
+            except queue.Empty:
+                continue
+            self.store_rows(puck_0_row, puck_1_row)
+        signal.signal(signal.SIGINT, previous_handler)
+
+        # wait for polling to end and store any samples still in the queue
+        self.acquisition_thread.join()
+        while (not self.packet_queue.empty()) and\
+                (self.samples_taken < self.max_samples):
+            self.store_rows(*self.packet_queue.get())
+        self.flush_data()
 
         # crop away any unused space.
-        if self.samples_taken < self.max_samples:
-            self.puck_0_rotational_acceleration =\
-                self.puck_0_rotational_acceleration[0:self.samples_taken, :]
-            self.puck_0_gyroscope =\
-                self.puck_0_gyroscope[0:self.samples_taken, :]
-            self.puck_0_linear_acceleration =\
-                self.puck_0_linear_acceleration[0:self.samples_taken, :]
-            self.puck_0_load_cell =\
-                self.puck_0_load_cell[0:self.samples_taken, :]
-            self.puck_0_quaternion =\
-                self.puck_0_quaternion[0:self.samples_taken, :]
-
-            self.puck_1_rotational_acceleration =\
-                self.puck_1_rotational_acceleration[0:self.samples_taken, :]
-            self.puck_1_gyroscope =\
-                self.puck_1_gyroscope[0:self.samples_taken, :]
-            self.puck_1_linear_acceleration =\
-                self.puck_1_linear_acceleration[0:self.samples_taken, :]
-            self.puck_1_load_cell =\
-                self.puck_1_load_cell[0:self.samples_taken, :]
-            self.puck_1_quaternion =\
-                self.puck_1_quaternion[0:self.samples_taken, :]
+        self.crop_data()
 
     def set_filename(self) -> None:
         '''
@@ -221,21 +444,64 @@ class PuckLogger(object):
 
         max_samples_needed =\
             int(recording_length_minutes * 60 * self.samples_per_second)
-        self.max_samples = max_samples_needed
+        self.allocate_data(max_samples_needed)
+
+    def allocate_data(self, max_samples: int) -> None:
+        '''
+        Initializes the pucks' data and staging arrays for a new recording
+
+        Parameters
+        ----------
+        max_samples:int
+            The total number of samples desired
+        '''
+        self.max_samples = max_samples
+        self.samples_taken = 0
+        self.samples_flushed = 0
 
         # initialize the data arrays of each puck to the total number of
-        # samples needed
-        self.puck_0_rotational_acceleration = np.zeros([max_samples_needed, 3])
-        self.puck_0_gyroscope = np.zeros([max_samples_needed, 3])
-        self.puck_0_linear_acceleration = np.zeros([max_samples_needed, 3])
-        self.puck_0_load_cell = np.zeros([max_samples_needed, 1])
-        self.puck_0_quaternion = np.zeros([max_samples_needed, 4])
-
-        self.puck_1_rotational_acceleration = np.zeros([max_samples_needed, 3])
-        self.puck_1_gyroscope = np.zeros([max_samples_needed, 3])
-        self.puck_1_linear_acceleration = np.zeros([max_samples_needed, 3])
-        self.puck_1_load_cell = np.zeros([max_samples_needed, 1])
-        self.puck_1_quaternion = np.zeros([max_samples_needed, 4])
+        # samples needed. The sensors send 16 bit integers and the quaternion
+        # is float32 so float32 holds every value exactly at half the size of
+        # float64. Streamed data goes straight to the .mat file instead
+        self.puck_0_data = None
+        self.puck_1_data = None
+        if not self.stream_mat:
+            self.puck_0_data = np.zeros([max_samples, COLUMNS_PER_PUCK],
+                                        dtype=DATA_TYPE)
+            self.puck_1_data = np.zeros([max_samples, COLUMNS_PER_PUCK],
+                                        dtype=DATA_TYPE)
+
+        # initialize the staging arrays each sample is first written to
+        self.puck_0_stage = np.zeros([STAGE_SIZE, COLUMNS_PER_PUCK],
+                                     dtype=DATA_TYPE)
+        self.puck_1_stage = np.zeros([STAGE_SIZE, COLUMNS_PER_PUCK],
+                                     dtype=DATA_TYPE)
+
+    def open_mat_stream(self) -> None:
+        '''
+        Creates the .mat file and its datasets to stream the data into
+
+        Each variable of the .mat file is a chunked, compressed dataset that
+        grows as the staged samples are flushed to it, so the recording is
+        never held in memory. MATLAB reads the dimensions of HDF5 datasets in
+        reverse order, so the datasets have a column per sample.
+        '''
+        # creates the data folder if it did not exist
+        os.makedirs(self.data_folder, exist_ok=True)
+
+        mat_path = os.path.join(self.data_folder, self.file_name+".mat")
+        self.mat_file = create_mat_v73(mat_path)
+        self.mat_datasets = []
+        for name, puck, columns in MAT_VARIABLES:
+            column_count = columns.stop - columns.start
+            # MATLAB only reads gzip compressed datasets
+            dataset = self.mat_file.create_dataset(
+                name, shape=(column_count, 0), maxshape=(column_count, None),
+                chunks=(column_count, MAT_CHUNK_SAMPLES), dtype=DATA_TYPE,
+                compression="gzip")
+            dataset.attrs["MATLAB_class"] =\
+                np.bytes_(MATLAB_CLASSES[np.dtype(DATA_TYPE)])
+            self.mat_datasets.append((dataset, puck, columns))
 
     def store_data(self, puck_0_packet: PuckPacket,
                    puck_1_packet: PuckPacket) -> None:
@@ -244,7 +510,7 @@ class PuckLogger(object):
 
         Saves each puck's PuckPacket class variables for the rotational
         accelerometer, gyroscope, linear acceleration, load_cell, and
-        quaternion. Then the sample number is incremented.
+        quaternion into the staging arrays.
 
         Parameters
         ----------
@@ -253,84 +519,122 @@ class PuckLogger(object):
         puck_1_packet:PuckPacket object
             Contains the polled data from the yellow puck
         '''
-        self.puck_0_rotational_acceleration[self.samples_taken, :] =\
-            puck_0_packet.rotational_accelerometer
-        self.puck_0_gyroscope[self.samples_taken, :] = puck_0_packet.gyroscope
-        self.puck_0_linear_acceleration[self.samples_taken, :] =\
-            puck_0_packet.linear_acceleration
-        self.puck_0_load_cell[self.samples_taken, :] =\
-            puck_0_packet.load_cell
-        self.puck_0_quaternion[self.samples_taken, :] =\
-            puck_0_packet.quaternion
-
-        self.puck_1_rotational_acceleration[self.samples_taken, :] =\
-            puck_1_packet.rotational_accelerometer
-        self.puck_1_gyroscope[self.samples_taken, :] = puck_1_packet.gyroscope
-        self.puck_1_linear_acceleration[self.samples_taken, :] =\
-            puck_1_packet.linear_acceleration
-        self.puck_1_load_cell[self.samples_taken, :] = puck_1_packet.load_cell
-        self.puck_1_quaternion[self.samples_taken, :] =\
-            puck_1_packet.quaternion
+        self.store_rows(puck_0_packet.as_row(), puck_1_packet.as_row())
+
+    def store_rows(self, puck_0_row: np.ndarray,
+                   puck_1_row: np.ndarray) -> None:
+        '''
+        Stages one sample of both pucks' logged data
+
+        Copies each puck's row of logged data into the staging arrays. Then
+        the sample number is incremented and the staging arrays are flushed
+        once they are full.
+
+        Parameters
+        ----------
+        puck_0_row:numpy array
+            The blue puck's row of logged data from PuckPacket.as_row
+        puck_1_row:numpy array
+            The yellow puck's row of logged data from PuckPacket.as_row
+        '''
+        stage_row = self.samples_taken - self.samples_flushed
+        self.puck_0_stage[stage_row, :] = puck_0_row
+        self.puck_1_stage[stage_row, :] = puck_1_row
 
         self.samples_taken += 1  # increment the sample number
 
-    def write_data(self) -> None:
+        # copy the staged samples to the data variables once the stage is full
+        if stage_row == STAGE_SIZE - 1:
+            self.flush_data()
+
+    def flush_data(self) -> None:
         '''
-        Writes the logged data to a python dictionary and .mat file
+        Copies the staged samples into the data variables or .mat file
 
-        Saves the python data into a dictionary and then converts that into a
-        self saved to the data folder. That shelf is then converted to a .mat
-        file.
+        Copies every sample in the staging arrays that has not been flushed
+        into the data variables with one block copy per puck, or appends them
+        to the .mat file's datasets when streaming. This must be called before
+        the data variables are read.
+        '''
+        staged = self.samples_taken - self.samples_flushed
+        if not staged:
+            return
+        rows = slice(self.samples_flushed, self.samples_taken)
+
+        if self.mat_file is not None:
+            stages = (self.puck_0_stage, self.puck_1_stage)
+            for dataset, puck, columns in self.mat_datasets:
+                dataset.resize(self.samples_taken, axis=1)
+                dataset[:, rows] = stages[puck][:staged, columns].T
+        else:
+            # each sample is one contiguous row so the stage is one block
+            # copy
+            self.puck_0_data[rows, :] = self.puck_0_stage[:staged, :]
+            self.puck_1_data[rows, :] = self.puck_1_stage[:staged, :]
+
+        self.samples_flushed = self.samples_taken
+
+    def crop_data(self) -> None:
         '''
-        data_dictionary = {
-            "puck_0_rotational_acceleration":
-                self.puck_0_rotational_acceleration,
-            "p0_gyroscope": self.puck_0_gyroscope,
-            "p0_linear_acceleration": self.puck_0_linear_acceleration,
-            "p0_load_cell": self.puck_0_load_cell,
-            "p0_quaternion": self.puck_0_quaternion,
-
-            "puck_1_rotational_acceleration":
-                self.puck_1_rotational_acceleration,
-            "p1_gyroscope": self.puck_1_gyroscope,
-            "p1_linear_acceleration": self.puck_1_linear_acceleration,
-            "p1_load_cell": self.puck_1_load_cell,
-            "p1_quaternion": self.puck_1_quaternion
-            }
-
-        # creates the path to the log file self
-        data_shelf_name = os.path.join(self.data_folder,
-                                       self.file_name+".shelve")
+        Trims the unused samples off the end of the data variables
 
-        # creates the data folder if it did not exist
-        if not os.path.exists(self.data_folder):
-            os.makedirs(data_shelf_name)
+        The data variables are sized for the full recording, so this removes
+        the rows left over when the recording is stopped early. The arrays
+        are resized in place so the unused rows are freed instead of being
+        kept alive behind a view. Streamed data is never longer than the
+        samples taken.
+        '''
+        if (self.puck_0_data is not None) and\
+                (self.samples_taken < self.max_samples):
+            self.puck_0_data.resize((self.samples_taken, COLUMNS_PER_PUCK),
+                                    refcheck=False)
+            self.puck_1_data.resize((self.samples_taken, COLUMNS_PER_PUCK),
+                                    refcheck=False)
 
-        # saves the data into the data self
-        data_shelf = shelve.open(data_shelf_name)
-        for key in data_dictionary.keys():
-            data_shelf[key] = data_dictionary[key]
-        data_shelf.close()
+    def write_data(self) -> None:
+        '''
+        Writes the logged data to a .mat file
 
-        # saves the data self into a .mat file
+        Saves each of the logged variables into a compressed .mat file in the
+        data folder. Streamed data is already in its MATLAB v7.3 .mat file, so
+        that file is only closed and given its MATLAB header.
+        '''
         mat_path = os.path.join(self.data_folder, self.file_name+".mat")
-        io.savemat(mat_path, data_dictionary, appendmat=False)
+        if self.mat_file is not None:
+            self.mat_file.close()
+            self.mat_file = None
+            self.mat_datasets = []
+            write_mat_header(mat_path)
+            return
+
+        pucks_data = (self.puck_0_data, self.puck_1_data)
+        data_dictionary = {name: pucks_data[puck][:, columns]
+                           for name, puck, columns in MAT_VARIABLES}
+
+        # creates the data folder if it did not exist
+        os.makedirs(self.data_folder, exist_ok=True)
+
+        # saves the data into a compressed .mat file. The sensor data is
+        # smooth, so the file is around a third of its uncompressed size
+        io.savemat(mat_path, data_dictionary, appendmat=False,
+                   do_compression=True)
 
     def stop(self) -> None:
         '''
         Closes communication with the pucks and saves the log file data
         '''
+        # stop polling before the connection to the dongle is closed
+        self.keep_running = False
+        if self.acquisition_thread.is_alive():
+            self.acquisition_thread.join()
+
         # disconnects from the pucks and closes the connection to the dongle
-        self.puck.send_command(0, SENDVEL, 0x00, 0x00)
-        self.puck.send_command(1, SENDVEL, 0x00, 0x00)
+        self.puck.send_commands([(0, SENDVEL, 0x00, 0x00),
+                                 (1, SENDVEL, 0x00, 0x00)])
         self.puck.close()
 
         # save the log file
         self.write_data()
-        try:
-            self.check_stop_thread.join(2)  # stop the thread after 2 seconds
-        except Exception:
-            pass
 
 
 if __name__ == "__main__":
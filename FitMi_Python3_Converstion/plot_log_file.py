@@ -1,7 +1,8 @@
 '''
 Plots data from the a log file.
 
-Takes in a Python data file and plots each of the data types to their own plot.
+Takes in a .mat data file and plots each of the data types to their own
+subplot of one figure.
 
 Parameters
 ----------
@@ -13,23 +14,23 @@ full_path : str
     Path to the data file
 error_string : string
     error message if the path to the file does not exist
-data_shelf : python data file
-    data from the log file
+log_data : dict
+    data from the log file keyed by data type
 fig : matplotlib.pyplot figure
-    figure for each data type
-ax : matplotlib.pyplot axis
-    axis for a data plot
+    figure for all of the data types
+axes : numpy array
+    axis for each data type's plot
 '''
 import matplotlib.pyplot as plt
 import os
-import shelve
+from scipy import io
 
 # get the path to the data folder
 data_folder = os.path.join(os.getcwd(), "data")
 
 # ask for the data file name and add the right extension
 file_name = input("enter the name of the file you want to plot: ")
-file_name += ".shelve"
+file_name += ".mat"
 
 # create the file path to the data file
 full_path = os.path.join(data_folder, file_name)
@@ -40,20 +41,29 @@ if not os.path.exists(full_path):
     error_string = "%s not found" % full_path
     raise Exception(error_string)
 
-# get the data from the log file
-data_shelf = shelve.open(full_path)
+# get the data from the log file. scipy can not read MATLAB v7.3 files, so
+# those are read as the HDF5 files they are
+try:
+    log_data = io.loadmat(full_path)
+except NotImplementedError:
+    import h5py
+    with h5py.File(full_path, "r") as mat_file:
+        log_data = {key: mat_file[key][()].T for key in mat_file.keys()}
+
+# leave out the header variables scipy adds to the data
+log_data = {key: value for key, value in log_data.items()
+            if not key.startswith("__")}
 
 # show the user the data types in the log file
-print(data_shelf.keys())
+print(log_data.keys())
 
-# make a plot for each data type
-for key in data_shelf.keys():
-    fig = plt.figure()
-    ax = fig.add_subplot(111)
-    ax.plot(data_shelf[key])
+# make a plot for each data type in one figure. The plots share their sample
+# axis so zooming in on one zooms in on all of them
+fig, axes = plt.subplots(nrows=len(log_data), sharex=True, squeeze=False,
+                         figsize=(8, 2 * len(log_data)), layout="constrained")
+for ax, (key, data) in zip(axes[:, 0], log_data.items()):
+    ax.plot(data)
     ax.set_title(key)
-    fig.show()
-
-data_shelf.close()  # close the data file
+fig.show()
 
 input("press enter to close all")  # wait for user to end the script
@@ -1,9 +1,14 @@
 import customtkinter as ctk
+import numpy as np
+import queue
 import seaborn as sns
+import threading
+import time
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
+from matplotlib.transforms import Bbox
+from matplotlib.gridspec import SubplotSpec
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from Puck.puck_packet import PuckPacket
 from Puck.hid_puck import HIDPuckDongle
 from Puck.hid_puck import SENDVEL
 
@@ -27,18 +32,24 @@ class PlottingApp(ctk.CTk):
     ----------
     SAMPLES_PER_SECOND: int
         The number of times the pucks are queried per second
+    FRAMES_PER_SECOND: int
+        The number of times the plots are redrawn per second
     PAD_X: int
         Padding left and right of the GUI elements
     PAD_Y: int
         Padding above and below GUI elements
     PLOT_X: int
-        The width of the smaller figures in pixels
+        The width of each column of plots in pixels
     PLOT_Y: int
-        The height of the smaller figures in pixels
+        The height of each row of plots in pixels
     BUFFER_MIN: int
         The initialization of the start of the buffer
     BUFFER_MAX: int
         The initialization of the end time of the buffer
+    SLIDER_MIN: int
+        The smallest buffer size the slider can be set to
+    SLIDER_MAX: int
+        The largest buffer size the slider can be set to
     ANGLE_YMAX: int
         The upper bound of the angle plots
     ANGLE_YMIN: int
@@ -63,6 +74,8 @@ class PlottingApp(ctk.CTk):
         Title of the app
     keep_running : bool
         Boolean for checking if data logging should continue
+    fig: matplotlib.figure.Figure
+        The figure all of the data plots share
     roll_plot : DataSubplot object
         Plots the roll of one or both pucks
     pitch_plot : DataSubplot object
@@ -92,6 +105,31 @@ class PlottingApp(ctk.CTk):
         Plots the z linear acceleration of one or both pucks
     load_cell_plot : DataSubplot object
         Plots the force on the load cell of one or both pucks
+    data_plots : List[DataSubplot]
+        Every data plot in the order they are drawn
+    buffer_storage : numpy array
+        Memory for both pucks' ring buffers and ordered data at the largest
+        buffer size
+    x_points : numpy array
+        The sample numbers of the largest buffer size
+    puck_0_data : numpy array
+        Ring buffer of the blue puck's data with a row for each data plot
+    puck_1_data : numpy array
+        Ring buffer of the yellow puck's data with a row for each data plot
+    index : int
+        The column of the ring buffers the next sample is written to
+    puck_0_y_points : numpy array
+        The blue puck's data in order from oldest to newest. Each row is the
+        data of a data plot's line
+    puck_1_y_points : numpy array
+        The yellow puck's data in order from oldest to newest. Each row is the
+        data of a data plot's line
+    canvas: matplotlib.backends.backend_tkagg.FigureCanvasTkAgg
+        tkinter object to display the figure in the app
+    bg : plot region
+        Copy of the figure without the data lines
+    plot_bbox : matplotlib.transforms.Bbox
+        The area of the figure covered by the data plots' axes
     start_button: CTKButton
         Connects to pucks and starts polling data
     stop_button: CTKButton
@@ -100,6 +138,13 @@ class PlottingApp(ctk.CTk):
         Slider to decrease and increase the displayed buffer of data
     puck : HIDPuckDongle object
         Connects to the dongle for communicating to and from the pucks
+    sample_queue : queue.SimpleQueue
+        Queue of the pucks' plot values and touch states from the acquisition
+        thread
+    acquisition_thread : threading.Thread
+        Thread polling the pucks at the sample rate while recording
+    next_frame_time: float
+        The monotonic time in seconds get_data is next scheduled for
 
     Methods
     -------
@@ -111,14 +156,27 @@ class PlottingApp(ctk.CTk):
         Turns the running flag off and disconnects from pucks
     buffer_slider_callback(slider_value)
         Updates the DataSubplot objects with a new buffer size to display
+    acquire_data()
+        Polls the pucks at the sample rate and queues their plot values
     get_data()
-        Poll the pucks for new data on each sample time step
-    run(puck_0_data, puck_1_data)
-        Updates each data plot based on the polled data
-    update_buffers(puck_0_data, puck_1_data)
-        Uses polled data to update the DataSubplot objects
+        Plots the queued data on each frame
+    schedule_next_frame()
+        Calls get_data again at the next frame time
+    run(puck_0_touch, puck_1_touch)
+        Redraws each data plot with its updated buffers
+    on_draw(event)
+        Copies the figure after it is fully redrawn and draws the data on it
+    resize_buffers(buffer_length)
+        Sets every data plot's zeroed data buffers to the given length
+    update_buffers(puck_0_values, puck_1_values)
+        Uses polled data to update the data buffers
+    unroll_buffers()
+        Copies the ring buffers into the plots' data, oldest sample first
     '''
     SAMPLES_PER_SECOND = 60
+    # the plots are drawn less often than the pucks are sampled. Every sample
+    # is still plotted, a frame just adds all of the samples since the last
+    FRAMES_PER_SECOND = 30
 
     PAD_X = 5
     PAD_Y = 5
@@ -129,6 +187,10 @@ class PlottingApp(ctk.CTk):
     BUFFER_MIN = 0  # minimum of x axis on plots
     BUFFER_MAX = 200  # maximum of x axis of plots
 
+    # range of buffer sizes on the slider
+    SLIDER_MIN = 20
+    SLIDER_MAX = 500
+
     # y axis range for the roll, pitch yaw plots
     ANGLE_YMAX = 180
     ANGLE_YMIN = -ANGLE_YMAX
@@ -164,141 +226,134 @@ class PlottingApp(ctk.CTk):
         self.grid_rowconfigure((0, 1, 2, 3, 4, 5), weight=0)
         self.keep_running = False
 
-        self.roll_plot = DataSubplot(self, fig_x=self.PLOT_X / 100,
-                                     fig_y=self.PLOT_Y / 100,
-                                     buffer_min=self.BUFFER_MIN,
-                                     buffer_max=self.BUFFER_MAX,
-                                     y_min=self.ANGLE_YMIN / 2,
-                                     y_max=self.ANGLE_YMAX / 2)
-        self.roll_plot.grid(row=0, column=0, padx=self.PAD_X,
-                            pady=self.PAD_Y)
+        # all of the plots share one figure and canvas so each frame is drawn
+        # with one background restore and one blit. The figure is a dark theme
+        # to match with the rest of the app
+        sns.set_theme(context='poster', font_scale=0.5)
+        plt.style.use('dark_background')
+        self.fig = Figure(figsize=(self.PLOT_X * 3 / 100,
+                                   self.PLOT_Y * 5 / 100),
+                          layout="constrained")
+        grid = self.fig.add_gridspec(5, 3)
+
+        self.roll_plot =\
+            DataSubplot(self.fig, grid[0, 0], buffer_min=self.BUFFER_MIN,
+                        buffer_max=self.BUFFER_MAX, y_min=self.ANGLE_YMIN / 2,
+                        y_max=self.ANGLE_YMAX / 2)
         self.roll_plot.set_title("roll angle")
 
-        self.pitch_plot = DataSubplot(self, fig_x=self.PLOT_X / 100,
-                                      fig_y=self.PLOT_Y / 100,
-                                      buffer_min=self.BUFFER_MIN,
-                                      buffer_max=self.BUFFER_MAX,
-                                      y_min=self.ANGLE_YMIN,
-                                      y_max=self.ANGLE_YMAX)
-        self.pitch_plot.grid(row=0, column=1, padx=self.PAD_X,
-                             pady=self.PAD_Y)
+        self.pitch_plot =\
+            DataSubplot(self.fig, grid[0, 1], buffer_min=self.BUFFER_MIN,
+                        buffer_max=self.BUFFER_MAX, y_min=self.ANGLE_YMIN,
+                        y_max=self.ANGLE_YMAX)
         self.pitch_plot.set_title("pitch angle")
 
-        self.yaw_plot = DataSubplot(self, fig_x=self.PLOT_X / 100,
-                                    fig_y=self.PLOT_Y / 100,
-                                    buffer_min=self.BUFFER_MIN,
-                                    buffer_max=self.BUFFER_MAX,
-                                    y_min=self.ANGLE_YMIN,
-                                    y_max=self.ANGLE_YMAX)
-        self.yaw_plot.grid(row=0, column=2, padx=self.PAD_X,
-                           pady=self.PAD_Y)
+        self.yaw_plot =\
+            DataSubplot(self.fig, grid[0, 2], buffer_min=self.BUFFER_MIN,
+                        buffer_max=self.BUFFER_MAX, y_min=self.ANGLE_YMIN,
+                        y_max=self.ANGLE_YMAX)
         self.yaw_plot.set_title("yaw angle")
 
-        self.x_gyro_plot = DataSubplot(self, fig_x=self.PLOT_X / 100,
-                                       fig_y=self.PLOT_Y / 100,
-                                       buffer_min=self.BUFFER_MIN,
-                                       buffer_max=self.BUFFER_MAX,
-                                       y_min=self.GYRO_YMIN,
-                                       y_max=self.GYRO_YMAX)
-        self.x_gyro_plot.grid(row=1, column=0, padx=self.PAD_X,
-                              pady=self.PAD_Y)
+        self.x_gyro_plot =\
+            DataSubplot(self.fig, grid[1, 0], buffer_min=self.BUFFER_MIN,
+                        buffer_max=self.BUFFER_MAX, y_min=self.GYRO_YMIN,
+                        y_max=self.GYRO_YMAX)
         self.x_gyro_plot.set_title("x gyroscope")
 
-        self.y_gyro_plot = DataSubplot(self, fig_x=self.PLOT_X / 100,
-                                       fig_y=self.PLOT_Y / 100,
-                                       buffer_min=self.BUFFER_MIN,
-                                       buffer_max=self.BUFFER_MAX,
-                                       y_min=self.GYRO_YMIN,
-                                       y_max=self.GYRO_YMAX)
-        self.y_gyro_plot.grid(row=1, column=1, padx=self.PAD_X,
-                              pady=self.PAD_Y)
+        self.y_gyro_plot =\
+            DataSubplot(self.fig, grid[1, 1], buffer_min=self.BUFFER_MIN,
+                        buffer_max=self.BUFFER_MAX, y_min=self.GYRO_YMIN,
+                        y_max=self.GYRO_YMAX)
         self.y_gyro_plot.set_title("y gyroscope")
 
-        self.z_gyro_plot = DataSubplot(self, fig_x=self.PLOT_X / 100,
-                                       fig_y=self.PLOT_Y / 100,
-                                       buffer_min=self.BUFFER_MIN,
-                                       buffer_max=self.BUFFER_MAX,
-                                       y_min=self.GYRO_YMIN,
-                                       y_max=self.GYRO_YMAX)
-        self.z_gyro_plot.grid(row=1, column=2, padx=self.PAD_X,
-                              pady=self.PAD_Y)
+        self.z_gyro_plot =\
+            DataSubplot(self.fig, grid[1, 2], buffer_min=self.BUFFER_MIN,
+                        buffer_max=self.BUFFER_MAX, y_min=self.GYRO_YMIN,
+                        y_max=self.GYRO_YMAX)
         self.z_gyro_plot.set_title("z gyroscope")
 
         self.x_rotational_acceleration_plot =\
-            DataSubplot(self, fig_x=self.PLOT_X / 100, fig_y=self.PLOT_Y / 100,
-                        buffer_min=self.BUFFER_MIN, buffer_max=self.BUFFER_MAX,
+            DataSubplot(self.fig, grid[2, 0], buffer_min=self.BUFFER_MIN,
+                        buffer_max=self.BUFFER_MAX,
                         y_min=self.ROTATIONAL_ACCELERATION_YMIN,
                         y_max=self.ROTATIONAL_ACCELERATION_YMAX)
-        self.x_rotational_acceleration_plot.grid(row=2, column=0,
-                                                 padx=self.PAD_X,
-                                                 pady=self.PAD_Y)
         self.x_rotational_acceleration_plot.set_title("x rotational"
                                                       " acceleration")
 
         self.y_rotational_acceleration_plot =\
-            DataSubplot(self, fig_x=self.PLOT_X / 100, fig_y=self.PLOT_Y / 100,
-                        buffer_min=self.BUFFER_MIN, buffer_max=self.BUFFER_MAX,
+            DataSubplot(self.fig, grid[2, 1], buffer_min=self.BUFFER_MIN,
+                        buffer_max=self.BUFFER_MAX,
                         y_min=self.ROTATIONAL_ACCELERATION_YMIN,
                         y_max=self.ROTATIONAL_ACCELERATION_YMAX)
-        self.y_rotational_acceleration_plot.grid(row=2, column=1,
-                                                 padx=self.PAD_X,
-                                                 pady=self.PAD_Y)
         self.y_rotational_acceleration_plot.set_title("y rotational"
                                                       " acceleration")
 
         self.z_rotational_acceleration_plot =\
-            DataSubplot(self, fig_x=self.PLOT_X / 100, fig_y=self.PLOT_Y / 100,
-                        buffer_min=self.BUFFER_MIN, buffer_max=self.BUFFER_MAX,
+            DataSubplot(self.fig, grid[2, 2], buffer_min=self.BUFFER_MIN,
+                        buffer_max=self.BUFFER_MAX,
                         y_min=self.ROTATIONAL_ACCELERATION_YMIN,
                         y_max=self.ROTATIONAL_ACCELERATION_YMAX)
-        self.z_rotational_acceleration_plot.grid(row=2, column=2,
-                                                 padx=self.PAD_X,
-                                                 pady=self.PAD_Y)
         self.z_rotational_acceleration_plot.set_title("z rotational"
                                                       " acceleration")
 
         self.x_linear_acceleration_plot =\
-            DataSubplot(self, fig_x=self.PLOT_X / 100,
-                        fig_y=self.PLOT_Y / 100,
-                        buffer_min=self.BUFFER_MIN,
+            DataSubplot(self.fig, grid[3, 0], buffer_min=self.BUFFER_MIN,
                         buffer_max=self.BUFFER_MAX,
                         y_min=self.LINEAR_ACCELERATION_YMIN,
                         y_max=self.LINEAR_ACCELERATION_YMAX)
-        self.x_linear_acceleration_plot.grid(row=3, column=0, padx=self.PAD_X,
-                                             pady=self.PAD_Y)
         self.x_linear_acceleration_plot.set_title("x linear acceleration")
 
         self.y_linear_acceleration_plot =\
-            DataSubplot(self, fig_x=self.PLOT_X / 100,
-                        fig_y=self.PLOT_Y / 100,
-                        buffer_min=self.BUFFER_MIN,
+            DataSubplot(self.fig, grid[3, 1], buffer_min=self.BUFFER_MIN,
                         buffer_max=self.BUFFER_MAX,
                         y_min=self.LINEAR_ACCELERATION_YMIN,
                         y_max=self.LINEAR_ACCELERATION_YMAX)
-        self.y_linear_acceleration_plot.grid(row=3, column=1, padx=self.PAD_X,
-                                             pady=self.PAD_Y)
         self.y_linear_acceleration_plot.set_title("y linear acceleration")
 
         self.z_linear_acceleration_plot =\
-            DataSubplot(self, fig_x=self.PLOT_X / 100,
-                        fig_y=self.PLOT_Y / 100,
-                        buffer_min=self.BUFFER_MIN,
+            DataSubplot(self.fig, grid[3, 2], buffer_min=self.BUFFER_MIN,
                         buffer_max=self.BUFFER_MAX,
                         y_min=self.LINEAR_ACCELERATION_YMIN,
                         y_max=self.LINEAR_ACCELERATION_YMAX)
-        self.z_linear_acceleration_plot.grid(row=3, column=2, padx=self.PAD_X,
-                                             pady=self.PAD_Y)
         self.z_linear_acceleration_plot.set_title("z linear acceleration")
 
-        self.load_cell_plot = DataSubplot(self, fig_x=self.PLOT_X * 3 / 100,
-                                          fig_y=self.PLOT_Y / 100,
-                                          buffer_min=self.BUFFER_MIN,
-                                          buffer_max=self.BUFFER_MAX,
-                                          y_min=self.LOAD_CELL_YMIN,
-                                          y_max=self.LOAD_CELL_YMAX)
-        self.load_cell_plot.grid(row=4, column=0, columnspan=3)
+        self.load_cell_plot =\
+            DataSubplot(self.fig, grid[4, :], buffer_min=self.BUFFER_MIN,
+                        buffer_max=self.BUFFER_MAX, y_min=self.LOAD_CELL_YMIN,
+                        y_max=self.LOAD_CELL_YMAX)
         self.load_cell_plot.set_title("load cell")
 
+        self.data_plots = [self.roll_plot, self.pitch_plot, self.yaw_plot,
+                           self.x_gyro_plot, self.y_gyro_plot,
+                           self.z_gyro_plot,
+                           self.x_rotational_acceleration_plot,
+                           self.y_rotational_acceleration_plot,
+                           self.z_rotational_acceleration_plot,
+                           self.x_linear_acceleration_plot,
+                           self.y_linear_acceleration_plot,
+                           self.z_linear_acceleration_plot,
+                           self.load_cell_plot]
+
+        # every plot's data is kept in one ring buffer per puck with a row for
+        # each plot so a sample is added to all of the plots at once. The
+        # memory for the largest buffer size is made once and the buffers use
+        # the start of it, so moving the slider does not allocate anything
+        self.buffer_storage = np.zeros((4, len(self.data_plots),
+                                        self.SLIDER_MAX), dtype=np.float32)
+        self.x_points = np.arange(self.SLIDER_MAX, dtype=np.float32)
+        self.resize_buffers(self.BUFFER_MAX - self.BUFFER_MIN)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self)
+        self.canvas.get_tk_widget().grid(row=0, column=0, rowspan=5,
+                                         columnspan=3, padx=self.PAD_X,
+                                         pady=self.PAD_Y)
+
+        # copy the figure without the data lines whenever it is fully redrawn
+        self.bg = None
+        self.plot_bbox = None
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.canvas.draw()
+
         # Create the start recording button
         self.start_button = ctk.CTkButton(self, text="Start Recording",
                                           command=self.start_button_callback,
@@ -317,7 +372,8 @@ class PlottingApp(ctk.CTk):
 
         # Create scrollbar for buffer size
         self.buffer_slider = ctk.CTkSlider(self, orientation="horizontal",
-                                           width=500, from_=20, to=500,
+                                           width=500, from_=self.SLIDER_MIN,
+                                           to=self.SLIDER_MAX,
                                            command=self.buffer_slider_callback)
         self.buffer_slider.grid(row=5, column=2, padx=self.PAD_X,
                                 pady=self.PAD_Y)
@@ -326,20 +382,34 @@ class PlottingApp(ctk.CTk):
         # Connect to the dongle for puck communication
         self.puck = HIDPuckDongle()
 
-        self.after(int(1000/self.SAMPLES_PER_SECOND), self.get_data)
+        # the pucks are polled on their own thread so a slow read does not
+        # stall the app
+        self.sample_queue = queue.SimpleQueue()
+        self.acquisition_thread = None
+
+        self.next_frame_time = time.monotonic()
+        self.schedule_next_frame()
 
     def start_button_callback(self) -> None:
         '''
         Creates connection to pucks and changes running flag to on
         '''
+        # the pucks are already being polled
+        if (self.acquisition_thread is not None
+                and self.acquisition_thread.is_alive()):
+            return
+
         self.samples_taken = 0
         # Send command to communicate with both pucks
         self.puck.open()
-        self.puck.send_command(0, SENDVEL, 0x00, 0x01)
-        self.puck.send_command(1, SENDVEL, 0x00, 0x01)
+        self.puck.send_commands([(0, SENDVEL, 0x00, 0x01),
+                                 (1, SENDVEL, 0x00, 0x01)])
 
         # sample both pucks and pause by the sample rate
         self.keep_running = True
+        self.acquisition_thread = threading.Thread(target=self.acquire_data)
+        self.acquisition_thread.daemon = True
+        self.acquisition_thread.start()
 
     def stop_button_callback(self) -> None:
         '''
@@ -347,15 +417,20 @@ class PlottingApp(ctk.CTk):
         '''
         print("Recording Stopped")
         self.keep_running = False
-        self.puck.send_command(0, SENDVEL, 0x00, 0x00)
-        self.puck.send_command(1, SENDVEL, 0x00, 0x00)
+        # wait for the last poll to finish before closing the dongle
+        if self.acquisition_thread is not None:
+            self.acquisition_thread.join()
+            self.acquisition_thread = None
+        self.puck.send_commands([(0, SENDVEL, 0x00, 0x00),
+                                 (1, SENDVEL, 0x00, 0x00)])
         self.puck.close()
 
     def buffer_slider_callback(self, slider_value) -> None:
         '''
         Updates the DataSubplot objects with a new buffer size to display
 
-        Changes each subplot x axis limit a new, identical value
+        Changes each subplot x axis limit a new, identical value and clears the
+        data buffers to the new size
 
         Parameters
         ----------
@@ -363,190 +438,249 @@ class PlottingApp(ctk.CTk):
             The new value on the slider after it has been moved
         '''
         slider_value = int(slider_value)
-        self.roll_plot.set_xlim(slider_value)
-        self.pitch_plot.set_xlim(slider_value)
-        self.yaw_plot.set_xlim(slider_value)
-
-        self.x_gyro_plot.set_xlim(slider_value)
-        self.y_gyro_plot.set_xlim(slider_value)
-        self.z_gyro_plot.set_xlim(slider_value)
+        for data_plot in self.data_plots:
+            data_plot.set_xlim(slider_value)
+        self.resize_buffers(slider_value)
 
-        self.x_rotational_acceleration_plot.set_xlim(slider_value)
-        self.y_rotational_acceleration_plot.set_xlim(slider_value)
-        self.z_rotational_acceleration_plot.set_xlim(slider_value)
+        # redraw the axes once for all of the plots. The slider calls this for
+        # every step it is dragged through, so the redraws are left to tk to
+        # merge and on_draw copies the new background once it is done
+        self.canvas.draw_idle()
 
-        self.x_linear_acceleration_plot.set_xlim(slider_value)
-        self.y_linear_acceleration_plot.set_xlim(slider_value)
-        self.z_linear_acceleration_plot.set_xlim(slider_value)
+    def acquire_data(self) -> None:
+        '''
+        Polls the pucks at the sample rate and queues their plot values
 
-        self.load_cell_plot.set_xlim(slider_value)
+        Runs on its own thread while recording. The packets are updated in
+        place by the dongle, so copies of their values are queued.
+        '''
+        # Each sample is scheduled a fixed period after the last one so the
+        # time spent polling does not add to the period
+        period = 1.0 / self.SAMPLES_PER_SECOND
+
+        # the dongle updates the same packets in place, so they and the
+        # methods called on every sample are looked up once
+        check_for_new_data = self.puck.checkForNewPuckData
+        puck_0_packet = self.puck.puck_0_packet
+        puck_1_packet = self.puck.puck_1_packet
+        put_sample = self.sample_queue.put
+
+        next_poll_time = time.monotonic()
+        while self.keep_running:
+            check_for_new_data()
+            put_sample((puck_0_packet.plot_row(),
+                        puck_1_packet.plot_row(),
+                        puck_0_packet.touch, puck_1_packet.touch))
+
+            next_poll_time += period
+            sleep_time = next_poll_time - time.monotonic()
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+            else:
+                # fell behind, so schedule from now instead of rushing to
+                # catch up on the missed samples
+                next_poll_time = time.monotonic()
 
     def get_data(self) -> None:
         '''
-        Poll the pucks for new data on each sample time step
+        Plots the queued data on each frame
+
+        Adds every sample queued since the last frame to the plots and then
+        redraws them once.
         '''
-        if self.keep_running:
-            self.puck.checkForNewPuckData()
-            # send queried data to the plots and update them
+        samples = []
+        while True:
+            try:
+                samples.append(self.sample_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        for puck_0_values, puck_1_values, _, _ in samples:
             self.samples_taken += 1
-            self.run(self.puck.puck_0_packet, self.puck.puck_1_packet)
+            self.update_buffers(puck_0_values, puck_1_values)
+        if samples:
+            # send the newest touch states to the plots and update them
+            self.run(samples[-1][2], samples[-1][3])
+
+        self.schedule_next_frame()
 
-        self.after(int(1000/self.SAMPLES_PER_SECOND), self.get_data)
+    def schedule_next_frame(self) -> None:
+        '''
+        Calls get_data again at the next frame time
 
-    def run(self, puck_0_data: PuckPacket = None,
-            puck_1_data: PuckPacket = None) -> None:
+        Each frame is scheduled a fixed period after the last one so the time
+        spent drawing does not add to the period and the frame rate does not
+        drift.
+        '''
+        self.next_frame_time += 1.0 / self.FRAMES_PER_SECOND
+        delay = self.next_frame_time - time.monotonic()
+        if delay < 0:
+            # fell behind, so schedule from now instead of rushing to catch up
+            # on the missed frames
+            self.next_frame_time = time.monotonic()
+            delay = 0
+        self.after(int(delay * 1000), self.get_data)
+
+    def run(self, puck_0_touch: bool, puck_1_touch: bool) -> None:
         '''
-        Updates each data plot based on the polled data
+        Redraws each data plot with its updated buffers
 
-        Sends the polled data to each of the DataSubplot objects to update them
-        and then redraws the plots. This also checks if you are touching the
-        pucks to change the color of the load cell plots.
+        Redraws the plots after the DataSubplot objects are updated. This also
+        checks if you are touching the pucks to change the color of the load
+        cell plots.
 
         Parameters
         ----------
-        puck_0_data : PuckPacket object, optional
-            Contains all of the polled data from puck 0, the blue one
-        puck_1_data : PuckPacket object, optional
-            Contains all of the polled data from puck 1, the yellow one
+        puck_0_touch : bool
+            If puck 0, the blue one, is being touched
+        puck_1_touch : bool
+            If puck 1, the yellow one, is being touched
         '''
-        self.update_buffers(puck_0_data, puck_1_data)
+        self.load_cell_plot.set_color(0, "r" if puck_0_touch else "b")
+        self.load_cell_plot.set_color(1, "m" if puck_1_touch else "y")
 
-        self.roll_plot.draw()
-        self.pitch_plot.draw()
-        self.yaw_plot.draw()
+        # redraw every plot's lines over the background and show them together
+        self.unroll_buffers()
+        self.canvas.restore_region(self.bg, self.plot_bbox)
+        for data_plot in self.data_plots:
+            data_plot.draw()
+        self.canvas.blit(self.plot_bbox)
 
-        self.x_gyro_plot.draw()
-        self.y_gyro_plot.draw()
-        self.z_gyro_plot.draw()
-
-        self.x_rotational_acceleration_plot.draw()
-        self.y_rotational_acceleration_plot.draw()
-        self.z_rotational_acceleration_plot.draw()
+    def on_draw(self, event) -> None:
+        '''
+        Copies the figure after it is fully redrawn and draws the data on it
 
-        self.x_linear_acceleration_plot.draw()
-        self.y_linear_acceleration_plot.draw()
-        self.z_linear_acceleration_plot.draw()
+        Parameters
+        ----------
+        event : matplotlib.backend_bases.DrawEvent
+            The draw event of the canvas
+        '''
+        self.bg = self.canvas.copy_from_bbox(self.fig.bbox)
 
-        self.load_cell_plot.draw()
+        # only the axes change between full redraws, so the titles and the
+        # margins around them are left out of the per frame blit. The layout
+        # of the axes is only final once the figure is drawn
+        self.plot_bbox = Bbox.union([data_plot.data_plot.bbox
+                                     for data_plot in self.data_plots])
+        for data_plot in self.data_plots:
+            data_plot.draw()
 
-        if puck_0_data.touch:
-            self.load_cell_plot.puck_1_plot.set_color("r")
-        else:
-            self.load_cell_plot.puck_1_plot.set_color("b")
+    def resize_buffers(self, buffer_length: int) -> None:
+        '''
+        Sets every data plot's zeroed data buffers to the given length
 
-        if puck_1_data.touch and self.load_cell_plot.puck_2_plot:
-            self.load_cell_plot.puck_2_plot.set_color("m")
-        else:
-            self.load_cell_plot.puck_2_plot.set_color("y")
+        The buffers are ring buffers where a new sample overwrites the oldest
+        one so nothing is shifted or allocated per sample. They are views of
+        the start of the buffer storage so resizing them does not allocate
+        either. Each data plot's lines are given views of their rows of the
+        unrolled data.
 
-    def update_buffers(self, puck_0_data: PuckPacket,
-                       puck_1_data: PuckPacket) -> None:
+        Parameters
+        ----------
+        buffer_length: int
+            The number of points in each buffer
         '''
-        Uses polled data to update the DataSubplot subplots
+        buffers = self.buffer_storage[:, :, :buffer_length]
+        buffers.fill(0)
+        self.index = 0
+        (self.puck_0_data, self.puck_1_data, self.puck_0_y_points,
+         self.puck_1_y_points) = buffers
+
+        x_points = self.x_points[:buffer_length]
+        for data_plot, puck_0_y_points, puck_1_y_points in\
+                zip(self.data_plots, self.puck_0_y_points,
+                    self.puck_1_y_points):
+            data_plot.set_data(x_points, puck_0_y_points, puck_1_y_points)
+
+    def update_buffers(self, puck_0_values: np.ndarray,
+                       puck_1_values: np.ndarray) -> None:
+        '''
+        Uses polled data to update the data buffers
 
-        Takes an input of data from the pucks and parses the data to update
-        individual plots. This method also buzzes the puck if the user moves it
-        fast.
+        Writes a sample of every data plot's values over the oldest sample in
+        the buffers.
 
         Parameters
         ----------
-        puck_0_data : PuckPacket object
-            Contains all of the polled data from puck 0, the blue one
-        puck_1_data : PuckPacket object
-            Contains all of the polled data from puck 1, the yellow one
-        '''
-        self.roll_plot.update(puck_0_data.roll_pitch_yaw[0],
-                              puck_1_data.roll_pitch_yaw[0])
-        self.pitch_plot.update(puck_0_data.roll_pitch_yaw[1],
-                               puck_1_data.roll_pitch_yaw[1])
-        self.yaw_plot.update(puck_0_data.roll_pitch_yaw[2],
-                             puck_1_data.roll_pitch_yaw[2])
-
-        self.x_gyro_plot.update(puck_0_data.gyroscope[0],
-                                puck_1_data.gyroscope[0])
-        self.y_gyro_plot.update(puck_0_data.gyroscope[1],
-                                puck_1_data.gyroscope[1])
-        self.z_gyro_plot.update(puck_0_data.gyroscope[2],
-                                puck_1_data.gyroscope[2])
-
-        self.x_rotational_acceleration_plot.\
-            update(puck_0_data.rotational_accelerometer[0],
-                   puck_1_data.rotational_accelerometer[0])
-        self.y_rotational_acceleration_plot.\
-            update(puck_0_data.rotational_accelerometer[1],
-                   puck_1_data.rotational_accelerometer[1])
-        self.z_rotational_acceleration_plot.\
-            update(puck_0_data.rotational_accelerometer[2],
-                   puck_1_data.rotational_accelerometer[2])
-
-        self.x_linear_acceleration_plot.\
-            update(puck_0_data.linear_acceleration[0],
-                   puck_1_data.linear_acceleration[0])
-        self.y_linear_acceleration_plot.\
-            update(puck_0_data.linear_acceleration[1],
-                   puck_1_data.linear_acceleration[1])
-        self.z_linear_acceleration_plot.\
-            update(puck_0_data.linear_acceleration[2],
-                   puck_1_data.linear_acceleration[2])
-
-        self.load_cell_plot.update(puck_0_data.load_cell,
-                                   puck_1_data.load_cell)
-
-
-class DataSubplot(ctk.CTkFrame):
+        puck_0_values : numpy array
+            The plot values of puck 0, the blue one, from
+            PuckPacket.plot_row
+        puck_1_values : numpy array
+            The plot values of puck 1, the yellow one, from
+            PuckPacket.plot_row
+        '''
+        self.puck_0_data[:, self.index] = puck_0_values
+        self.puck_1_data[:, self.index] = puck_1_values
+
+        # the sample after the newest one is now the oldest
+        self.index = (self.index + 1) % self.puck_0_data.shape[1]
+
+    def unroll_buffers(self) -> None:
+        '''
+        Copies the ring buffers into the plots' data, oldest sample first
+        '''
+        split = self.puck_0_data.shape[1] - self.index
+        self.puck_0_y_points[:, :split] = self.puck_0_data[:, self.index:]
+        self.puck_0_y_points[:, split:] = self.puck_0_data[:, :self.index]
+        self.puck_1_y_points[:, :split] = self.puck_1_data[:, self.index:]
+        self.puck_1_y_points[:, split:] = self.puck_1_data[:, :self.index]
+
+
+class DataSubplot(object):
     '''
-    Creates each data plot for a puck sensor in a frame for the app
+    Creates each data plot for a puck sensor in the app's figure
 
-    Sets up the plot and updates the figure as new data comes in or attributes
-    are changed.
+    Sets up the plot and draws its lines from the app's data as new data comes
+    in or attributes are changed. The app owns the figure's canvas and the
+    data buffers of every plot.
 
     Attributes
     ----------
-    fig: matplotlib.figure.Figure
-        The overall figure for the data plot
     data_plot: subplot
         The axis the data is plotted on
-    canvas: matplotlib.backends.backend_tkagg.FigureCanvasTkAgg
-        tkinter object to display figure in the app
-    bg : plot region
-        Copy of the plot region
-    puck_0_data : List[int]
-        List of 0's the length of the buffer for the blue puck's data
-    puck_1_data : List[int]
-        List of 0's the length of the buffer for the yellow puck's data
+    puck_0_y_points : numpy array
+        View of the app's unrolled blue puck data for this plot
+    puck_1_y_points : numpy array
+        View of the app's unrolled yellow puck data for this plot
+    puck_1_plot : matplotlib.lines.Line2D
+        The blue puck's line
+    puck_2_plot : matplotlib.lines.Line2D
+        The yellow puck's line. None if only the blue puck is plotted
+    colors : List[str]
+        The current color of each plotted puck's line
 
     Methods
     -------
-    __init__(*args, fig_x, fig_y, buffer_min, buffer_max, y_min, y_max,
-             second_puc, **kwargs)
-        Create the base data plot with a dark theme
+    __init__(fig, subplot_spec, buffer_min, buffer_max, y_min, y_max,
+             second_puck)
+        Create the base data plot in the app's figure
     set_title(title)
-        Change the title of the figure
+        Change the title of the plot
     set_xlim(upper)
         Change the buffer size on the plot
-    update(self, puck_0_data, puck_1_data):
-        Add the new data to the end of the buffer of data
+    set_data(x_points, puck_0_y_points, puck_1_y_points)
+        Gives the plot's lines their data
+    set_color(puck, color)
+        Sets the color of one puck's line
     draw():
-        Adds the data to the subplot
+        Draws the data onto the plot
     '''
-    def __init__(self, *args, fig_x: float = 5.0, fig_y: float = 2.0,
-                 buffer_min: int = 0, buffer_max: int = 200, y_min: int,
-                 y_max: int, second_puck: bool = True, **kwargs) -> None:
+    def __init__(self, fig: Figure, subplot_spec: SubplotSpec,
+                 buffer_min: int = 0, buffer_max: int = 200, *, y_min: int,
+                 y_max: int, second_puck: bool = True) -> None:
         '''
-        Create the base data plot with a dark theme
+        Create the base data plot in the app's figure
 
-        Create the base data plot given values for its size, and axis limits.
-        The plot is a dark theme to match with the rest of the app and the plot
-        is initialized to show a line at 0 for the full buffer of data.
+        Create the base data plot given its place in the figure and axis
+        limits. The lines have no data until the app gives it to them with
+        set_data.
 
         Parameters
         ----------
-        *args
-            Any non keyword arguments for the super CTKFrame class
-        fig_x: float, default = 5.0
-            The width of the figure in hundreds of pixels
-        fig_y: float, default = 2.0
-            The height of the figure in hundreds of pixels
+        fig: matplotlib.figure.Figure
+            The figure all of the data plots share
+        subplot_spec: matplotlib.gridspec.SubplotSpec
+            The place of the plot in the figure's grid
         buffer_min: int, default = 0
             The lower end of the x axis of the plot
         buffer_max: int, default = 200
@@ -557,68 +691,45 @@ class DataSubplot(ctk.CTkFrame):
             The top of the y axis of the plot
         second_puck: bool, default = True
             True if both pucks are being plotted
-        **kwargs
-            Any other keyword arguments not specified for the super CTKFrame
-            class
         '''
-        super().__init__(*args, **kwargs)
-        sns.set_theme(context='poster', font_scale=0.5)
-        plt.style.use('dark_background')
-        self.fig = Figure(figsize=(fig_x, fig_y))
-        self.data_plot = self.fig.add_subplot(111)
+        self.data_plot = fig.add_subplot(subplot_spec)
         self.data_plot.set_xlim(buffer_min, buffer_max)
         self.data_plot.set_ylim(y_min, y_max)
 
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self)
-        self.canvas.get_tk_widget().pack()
-        self.canvas.draw()
-
-        # copy the subplot region
-        self.bg = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self.puck_0_y_points = None
+        self.puck_1_y_points = None
 
-        # create the base line for the blue puck and set the puck puck's line
-        # to None
-        self.puck_0_data = [0]*(buffer_max - buffer_min)
-        self.puck_1_data = None
-
-        # If you want to plot the second puck's data, create the base line for
-        # the yellow puck
-        if second_puck:
-            self.puck_1_data = [0]*(buffer_max - buffer_min)
-
-        # create the x values for the data plot
-        self.x_points = range(buffer_min, buffer_max)
-
-        # plot the base line of the blue puck in blue
-        self.puck_1_plot = self.data_plot.plot(self.x_points,
-                                               self.puck_0_data, '-',
-                                               color="b")[0]
+        # create the line of the blue puck in blue. The lines are only drawn
+        # by blitting, so they are animated to keep them out of full canvas
+        # draws
+        self.puck_1_plot = self.data_plot.plot([], [], '-', color="b",
+                                               animated=True)[0]
         self.puck_2_plot = None
 
-        # if there is a need to plot a second puck, plot the yellow puck in
-        # green
+        # if there is a need to plot a second puck, create the yellow puck's
+        # line in yellow
         if second_puck:
-            self.puck_2_plot = self.data_plot.plot(self.x_points,
-                                                   self.puck_1_data,
-                                                   '-', color="y")[0]
+            self.puck_2_plot = self.data_plot.plot([], [], '-', color="y",
+                                                   animated=True)[0]
+        self.colors = ["b", "y"][:2 if second_puck else 1]
 
     def set_title(self, title: str) -> None:
         '''
-        Change the title of the figure
+        Change the title of the plot
 
         Parameters
         ----------
         title: str
-            The name of the figure
+            The name of the plot
         '''
         self.data_plot.set_title(title)
-        self.canvas.draw()
 
     def set_xlim(self, upper: int) -> None:
         '''
         Change the buffer size on the plot
 
-        This changes the x limit of the plot from 0 to the value passed in
+        This changes the x limit of the plot from 0 to the value passed in. The
+        plot shows the change the next time the app's canvas is fully redrawn.
 
         Parameters
         ----------
@@ -626,58 +737,66 @@ class DataSubplot(ctk.CTkFrame):
             The upper limit of the x axis
         '''
         self.data_plot.set_xlim(0, upper)
-        self.puck_0_data = [0]*(upper)
-        self.puck_1_data = [0]*(upper)
-        self.x_points = range(upper)
-        self.draw()
-        self.canvas.draw()
 
-    def update(self, puck_0_data: PuckPacket,
-               puck_1_data: PuckPacket = None) -> None:
+    def set_data(self, x_points: np.ndarray, puck_0_y_points: np.ndarray,
+                 puck_1_y_points: np.ndarray) -> None:
+        '''
+        Gives the plot's lines their data
+
+        The x values only change with the buffer size, so they are only given
+        to the lines here. The y values are views of the app's unrolled data
+        and are given to the lines each time they are drawn.
+
+        Parameters
+        ----------
+        x_points : numpy array
+            The x values of the data plot
+        puck_0_y_points : numpy array
+            The blue puck's data in order from oldest to newest
+        puck_1_y_points : numpy array
+            The yellow puck's data in order from oldest to newest
         '''
-        Add the new data to the end of the buffer of data
+        self.puck_0_y_points = puck_0_y_points
+        self.puck_1_y_points = puck_1_y_points
+        self.puck_1_plot.set_xdata(x_points)
+        if self.puck_2_plot:
+            self.puck_2_plot.set_xdata(x_points)
 
-        Adds new data to the end of the data buffer and removes the first point
-        in the buffer.
+    def set_color(self, puck: int, color: str) -> None:
+        '''
+        Sets the color of one puck's line
 
         Parameters
         ----------
-        puck_0_data : int
-            new data from the blue puck
-        puck_1_data : int
-            new data from the yellow puck
-        '''
-        # adds data to the end of the blue puck buffer and removes the first
-        # point
-        self.puck_0_data.pop(0)
-        self.puck_0_data.append(puck_0_data)
-
-        # if you want to track two pucks, adds data to the end of the yellow
-        # puck buffer and removes the first point
-        if (puck_1_data is not None) and (self.puck_1_data is not None):
-            self.puck_1_data.pop(0)
-            self.puck_1_data.append(puck_1_data)
+        puck : int
+            The puck whose line is changed (0 = blue puck, 1 = yellow puck)
+        color : str
+            The new color of the puck's line
+        '''
+        # only update the line if the puck is plotted and its color changed
+        if puck < len(self.colors) and self.colors[puck] != color:
+            self.colors[puck] = color
+            (self.puck_1_plot, self.puck_2_plot)[puck].set_color(color)
 
     def draw(self) -> None:
         '''
-        Adds the data to the plot
+        Draws the data onto the plot
 
-        Adds the data from the data buffers to the plot and redraws it for the
-        animation.
+        Draws the lines with their newest data onto the canvas. The app
+        restores the background before and blits the figure after drawing
+        every plot.
         '''
-        # adds data from the pucks to the plot
-        self.puck_1_plot.set_data(self.x_points, self.puck_0_data)
-        if self.puck_2_plot and self.puck_1_data:
-            self.puck_2_plot.set_data(self.x_points, self.puck_1_data)
+        # only give the lines their new y values so matplotlib does not
+        # convert the unchanged x values again
+        self.puck_1_plot.set_ydata(self.puck_0_y_points)
+        if self.puck_2_plot:
+            self.puck_2_plot.set_ydata(self.puck_1_y_points)
 
-        # redraw the figure
-        self.fig.canvas.restore_region(self.bg)
+        # draw the lines for the animation
         self.data_plot.draw_artist(self.puck_1_plot)
         if self.puck_2_plot:
             self.data_plot.draw_artist(self.puck_2_plot)
 
-        self.fig.canvas.blit(self.data_plot.bbox)
-
 
 if __name__ == "__main__":
     app = PlottingApp()
@@ -1,9 +1,12 @@
+import queue
+import threading
 import time
+import numpy as np
 from matplotlib import pyplot as plt
+from matplotlib.transforms import Bbox
 from ani_plot import AniPlot
 from Puck.hid_puck import HIDPuckDongle
 from Puck.hid_puck import SENDVEL
-from Puck.puck_packet import PuckPacket
 
 
 class PuckPlotter(object):
@@ -18,6 +21,8 @@ class PuckPlotter(object):
     ----------
     samples_per_second : int
         The number of times the pucks are queried per second
+    frames_per_second : int
+        The number of times the plots are redrawn per second
     max_run_time_seconds : int
         Total amount of time the code runs for
     max_samples : int
@@ -53,6 +58,29 @@ class PuckPlotter(object):
         Plots the z linear linear acceleration of one or both pucks
     load_cell_plot : AniPlot object
         Plots the force on the load cell of one or both pucks
+    data_plots : List[AniPlot]
+        Every data plot in the order they are drawn
+    puck_0_data : numpy array
+        Ring buffer of the blue puck's data with a row for each data plot
+    puck_1_data : numpy array
+        Ring buffer of the yellow puck's data with a row for each data plot
+    index : int
+        The column of the ring buffers the next sample is written to
+    plot_bbox : matplotlib.transforms.Bbox
+        The area of the figure covered by the data plots' axes
+    samples_taken : int
+        The number of samples plotted since start
+    keep_running : bool
+        If the acquisition thread should keep polling the pucks
+    sample_queue : queue.SimpleQueue
+        Queue of the pucks' plot values and touch states from the acquisition
+        thread
+    acquisition_thread : threading.Thread
+        Thread polling the pucks at the sample rate while recording
+    next_frame_time : float
+        The monotonic time in seconds get_data is next scheduled for
+    timer : matplotlib.backend_bases.TimerBase
+        Single shot timer of the figure's GUI that calls get_data
     puck : HIDPuckDongle object
         Connects to the dongle for communicating to and from the pucks
 
@@ -62,12 +90,18 @@ class PuckPlotter(object):
         Creates subplots to show data from the FitMi pucks
     start()
         Starts recording from the pucks and polls based on sample rate
+    acquire_data()
+        Polls the pucks at the sample rate and queues their plot values
+    get_data()
+        Plots the queued data and schedules the next frame
     stop()
         Stops recording from the pucks and close the dongle connection
-    run(puck_0_data, puck_1_data)
-        Updates each data plot based on the polled data
-    update_buffers(puck_0_data, puck_1_data)
-        Uses polled data to update AniPlot subplots
+    run(puck_0_touch, puck_1_touch)
+        Redraws each data plot with its updated buffers
+    on_draw(event)
+        Finds the area of the data plots after the figure is fully redrawn
+    update_buffers(puck_0_values, puck_1_values)
+        Uses polled data to update the AniPlot subplots
     '''
     def __init__(self) -> None:
         '''
@@ -77,6 +111,7 @@ class PuckPlotter(object):
         plotting ranges and labels.
         '''
         self.samples_per_second = 60
+        self.frames_per_second = 30
         self.max_run_time_seconds = 100
         self.max_samples = self.samples_per_second * self.max_run_time_seconds
 
@@ -104,8 +139,11 @@ class PuckPlotter(object):
         load_cell_ymin = 0
 
         # create a figure and set its size and the size of the subplots so the
-        # labels don't overlap
-        self.fig = plt.figure()
+        # labels don't overlap. The figure is only watched, so it is made
+        # without the navigation toolbar, which would otherwise update its
+        # cursor readout on every mouse move over the animated plots
+        with plt.rc_context({"toolbar": "None"}):
+            self.fig = plt.figure()
         self.fig.suptitle("FitMi Puck Data", fontsize=20)
         self.fig.set_size_inches(20, 10, forward=True)
         plt.subplots_adjust(left=0.1, bottom=0.1, right=0.9, top=0.9,
@@ -179,135 +217,231 @@ class PuckPlotter(object):
                                       second_puck=True)
         self.load_cell_plot.set_ylabel("load cell")
 
+        self.data_plots = [self.roll_plot, self.pitch_plot, self.yaw_plot,
+                           self.x_gyro_plot, self.y_gyro_plot,
+                           self.z_gyro_plot,
+                           self.x_rotational_acceleration_plot,
+                           self.y_rotational_acceleration_plot,
+                           self.z_rotational_acceleration_plot,
+                           self.x_linear_acceleration_plot,
+                           self.y_linear_acceleration_plot,
+                           self.z_linear_acceleration_plot,
+                           self.load_cell_plot]
+
+        # every plot's data is kept in one ring buffer per puck with a row for
+        # each plot so a sample is added to all of the plots at once
+        buffer_shape = (len(self.data_plots), buffer_max - buffer_min)
+        self.puck_0_data = np.zeros(buffer_shape, dtype=np.float32)
+        self.puck_1_data = np.zeros(buffer_shape, dtype=np.float32)
+        self.index = 0
+        for data_plot, puck_0_data, puck_1_data in\
+                zip(self.data_plots, self.puck_0_data, self.puck_1_data):
+            data_plot.set_buffers(puck_0_data, puck_1_data)
+
         # aligns all of the created y axis labels and refresh the plot
+        self.plot_bbox = None
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
         self.fig.align_ylabels(self.fig.axes)
         self.fig.canvas.draw()
 
         # Connect to the dongle for puck communication
         self.puck = HIDPuckDongle()
 
+        # the pucks are polled on their own thread so a slow read does not
+        # stall the window. The frame timer is made when recording starts
+        self.samples_taken = 0
+        self.keep_running = False
+        self.sample_queue = queue.SimpleQueue()
+        self.acquisition_thread = None
+        self.next_frame_time = None
+        self.timer = None
+
     def start(self) -> None:
         '''
         Starts recording from the pucks and polls based on sample rate
         '''
         # Send command to communicate with both pucks
         self.puck.open()
-        self.puck.send_command(0, SENDVEL, 0x00, 0x01)
-        self.puck.send_command(1, SENDVEL, 0x00, 0x01)
+        self.puck.send_commands([(0, SENDVEL, 0x00, 0x01),
+                                 (1, SENDVEL, 0x00, 0x01)])
+
+        # sample both pucks on the acquisition thread
+        self.samples_taken = 0
+        self.keep_running = True
+        self.acquisition_thread = threading.Thread(target=self.acquire_data)
+        self.acquisition_thread.daemon = True
+        self.acquisition_thread.start()
+
+        # plot the samples from a timer of the figure's GUI so its event loop
+        # runs between frames and keeps the window responsive
+        self.next_frame_time = time.monotonic()
+        self.timer = self.fig.canvas.new_timer(interval=0)
+        self.timer.single_shot = True
+        self.timer.add_callback(self.get_data)
+        self.timer.start()
+
+        # run the GUI until every sample is plotted or the window is closed
+        plt.show()
+        self.timer.stop()
+
+    def acquire_data(self) -> None:
+        '''
+        Polls the pucks at the sample rate and queues their plot values
 
-        # sample both pucks and pause by the sample rate
+        Runs on its own thread while recording and stops after the last
+        sample. The packets are updated in place by the dongle, so copies of
+        their values are queued.
+        '''
+        # Each sample is scheduled a fixed period after the last one so the
+        # time spent polling does not add to the period
+        period = 1.0 / self.samples_per_second
+
+        # the dongle updates the same packets in place, so they and the
+        # methods called on every sample are looked up once
+        check_for_new_data = self.puck.checkForNewPuckData
+        puck_0_packet = self.puck.puck_0_packet
+        puck_1_packet = self.puck.puck_1_packet
+        put_sample = self.sample_queue.put
+
+        next_poll_time = time.monotonic()
         for _ in range(self.max_samples):
-            self.puck.checkForNewPuckData()
-            # send queried data to the plots and update them
-            self.run(self.puck.puck_0_packet, self.puck.puck_1_packet)
-            time.sleep(1.0/self.samples_per_second)
+            if not self.keep_running:
+                break
+            check_for_new_data()
+            put_sample((puck_0_packet.plot_row(),
+                        puck_1_packet.plot_row(),
+                        puck_0_packet.touch, puck_1_packet.touch))
+
+            next_poll_time += period
+            sleep_time = next_poll_time - time.monotonic()
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+            else:
+                # fell behind, so schedule from now instead of rushing to
+                # catch up on the missed samples
+                next_poll_time = time.monotonic()
+
+    def get_data(self) -> None:
+        '''
+        Plots the queued data and schedules the next frame
+
+        Adds every sample queued since the last frame to the plots and then
+        redraws them once. Each frame is scheduled a fixed period after the
+        last one so the time spent drawing does not add to the period. The
+        figure is closed after the last sample is plotted.
+        '''
+        samples = []
+        while True:
+            try:
+                samples.append(self.sample_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        for puck_0_values, puck_1_values, _, _ in samples:
+            self.update_buffers(puck_0_values, puck_1_values)
+        if samples:
+            self.samples_taken += len(samples)
+            # send the newest touch states to the plots and update them
+            self.run(samples[-1][2], samples[-1][3])
+
+        if self.samples_taken >= self.max_samples:
+            plt.close(self.fig)
+            return
+
+        self.next_frame_time += 1.0 / self.frames_per_second
+        delay = self.next_frame_time - time.monotonic()
+        if delay < 0:
+            # fell behind, so schedule from now instead of rushing to catch up
+            # on the missed frames
+            self.next_frame_time = time.monotonic()
+            delay = 0
+        self.timer.interval = int(delay * 1000)
+        self.timer.start()
 
     def stop(self) -> None:
         '''
         Stops recording from the pucks and close the dongle connection
         '''
-        self.puck.send_command(0, SENDVEL, 0x00, 0x00)
-        self.puck.send_command(1, SENDVEL, 0x00, 0x00)
+        self.keep_running = False
+        # wait for the last poll to finish before closing the dongle
+        if self.acquisition_thread is not None:
+            self.acquisition_thread.join()
+            self.acquisition_thread = None
+        self.puck.send_commands([(0, SENDVEL, 0x00, 0x00),
+                                 (1, SENDVEL, 0x00, 0x00)])
         self.puck.close()
 
-    def run(self, puck_0_data: PuckPacket = None,
-            puck_1_data: PuckPacket = None) -> None:
+    def run(self, puck_0_touch: bool, puck_1_touch: bool) -> None:
         '''
-        Updates each data plot based on the polled data
+        Redraws each data plot with its updated buffers
 
-        Sends the polled data to each of the AniPlot objects to update them and
-        then redraws the plots. This also checks if you are touching the pucks
-        to change the color of the load cell plots.
+        Redraws the plots after the ring buffers are updated. This also checks
+        if you are touching the pucks to change the color of the load cell
+        plots.
 
         Parameters
         ----------
-        puck_0_data : PuckPacket object, optional
-            Contains all of the polled data from puck 0, the blue one
-        puck_1_data : PuckPacket object, optional
-            Contains all of the polled data from puck 1, the yellow one
+        puck_0_touch : bool
+            If puck 0, the blue one, is being touched
+        puck_1_touch : bool
+            If puck 1, the yellow one, is being touched
         '''
-        self.update_buffers(puck_0_data, puck_1_data)
-
-        self.roll_plot.draw(self.fig)
-        self.pitch_plot.draw(self.fig)
-        self.yaw_plot.draw(self.fig)
-
-        self.x_gyro_plot.draw(self.fig)
-        self.y_gyro_plot.draw(self.fig)
-        self.z_gyro_plot.draw(self.fig)
+        # the load cell colors are set before drawing so a touch shows on the
+        # same frame
+        if puck_0_touch:
+            self.load_cell_plot.set_color(0, "r")
+        else:
+            self.load_cell_plot.set_color(0, "b")
 
-        self.x_rotational_acceleration_plot.draw(self.fig)
-        self.y_rotational_acceleration_plot.draw(self.fig)
-        self.z_rotational_acceleration_plot.draw(self.fig)
+        if puck_1_touch:
+            self.load_cell_plot.set_color(1, "m")
+        else:
+            self.load_cell_plot.set_color(1, "g")
 
-        self.x_linear_acceleration_plot.draw(self.fig)
-        self.y_linear_acceleration_plot.draw(self.fig)
-        self.z_linear_acceleration_plot.draw(self.fig)
+        # draw every plot's lines over its background and show them together
+        # with one blit instead of one per plot
+        for data_plot in self.data_plots:
+            data_plot.draw_lines(self.index)
+        self.fig.canvas.blit(self.plot_bbox)
 
-        self.load_cell_plot.draw(self.fig)
+    def on_draw(self, event) -> None:
+        '''
+        Finds the area of the data plots after the figure is fully redrawn
 
-        if puck_0_data.touch:
-            self.load_cell_plot.puck_1_plot.set_color("r")
-        else:
-            self.load_cell_plot.puck_1_plot.set_color("b")
+        Only the axes change between full redraws, so the title, labels, and
+        margins are left out of the blit. A redraw may follow a resize, so the
+        area is found again each time.
 
-        if puck_1_data.touch and self.load_cell_plot.puck_2_plot:
-            self.load_cell_plot.puck_2_plot.set_color("m")
-        else:
-            self.load_cell_plot.puck_2_plot.set_color("g")
+        Parameters
+        ----------
+        event : matplotlib.backend_bases.DrawEvent
+            The draw event of the figure's canvas
+        '''
+        self.plot_bbox = Bbox.union([data_plot.ax.bbox
+                                     for data_plot in self.data_plots])
 
-    def update_buffers(self, puck_0_data: PuckPacket,
-                       puck_1_data: PuckPacket) -> None:
+    def update_buffers(self, puck_0_values: np.ndarray,
+                       puck_1_values: np.ndarray) -> None:
         '''
         Uses polled data to update the AniPlot subplots
 
-        Takes an input of data from the pucks and parses the data to update
-        individual plots. This method also buzzes the puck if the user moves it
-        fast.
+        Writes a sample of every data plot's values over the oldest sample in
+        the ring buffers the plots share.
 
         Parameters
         ----------
-        puck_0_data : PuckPacket object
-            Contains all of the polled data from puck 0, the blue one
-        puck_1_data : PuckPacket object
-            Contains all of the polled data from puck 1, the yellow one
+        puck_0_values : numpy array
+            The plot values of puck 0, the blue one, from
+            PuckPacket.plot_row
+        puck_1_values : numpy array
+            The plot values of puck 1, the yellow one, from
+            PuckPacket.plot_row
         '''
-        self.roll_plot.update(puck_0_data.roll_pitch_yaw[0],
-                              puck_1_data.roll_pitch_yaw[0])
-        self.pitch_plot.update(puck_0_data.roll_pitch_yaw[1],
-                               puck_1_data.roll_pitch_yaw[1])
-        self.yaw_plot.update(puck_0_data.roll_pitch_yaw[2],
-                             puck_1_data.roll_pitch_yaw[2])
-
-        self.x_gyro_plot.update(puck_0_data.gyroscope[0],
-                                puck_1_data.gyroscope[0])
-        self.y_gyro_plot.update(puck_0_data.gyroscope[1],
-                                puck_1_data.gyroscope[1])
-        self.z_gyro_plot.update(puck_0_data.gyroscope[2],
-                                puck_1_data.gyroscope[2])
-
-        self.x_rotational_acceleration_plot.\
-            update(puck_0_data.rotational_accelerometer[0],
-                   puck_1_data.rotational_accelerometer[0])
-        self.y_rotational_acceleration_plot.\
-            update(puck_0_data.rotational_accelerometer[1],
-                   puck_1_data.rotational_accelerometer[1])
-        self.z_rotational_acceleration_plot.\
-            update(puck_0_data.rotational_accelerometer[2],
-                   puck_1_data.rotational_accelerometer[2])
-
-        self.x_linear_acceleration_plot.\
-            update(puck_0_data.linear_acceleration[0],
-                   puck_1_data.linear_acceleration[0])
-        self.y_linear_acceleration_plot.\
-            update(puck_0_data.linear_acceleration[1],
-                   puck_1_data.linear_acceleration[1])
-        self.z_linear_acceleration_plot.\
-            update(puck_0_data.linear_acceleration[2],
-                   puck_1_data.linear_acceleration[2])
-
-        self.load_cell_plot.update(puck_0_data.load_cell,
-                                   puck_1_data.load_cell)
+        self.puck_0_data[:, self.index] = puck_0_values
+        self.puck_1_data[:, self.index] = puck_1_values
+
+        # the sample after the newest one is now the oldest
+        self.index = (self.index + 1) % self.puck_0_data.shape[1]
 
 
 if __name__ == '__main__':
@@ -1,11 +1,11 @@
 import customtkinter as ctk
 import tkinter as tk
-from log_puck_data import PuckLogger
+from log_puck_data import PuckLogger, MAT_VARIABLES
 from Puck.hid_puck import SENDVEL
-import numpy as np
-import shelve
 from scipy import io
 import os
+import threading
+import time
 
 
 # Modes: "System" (standard), "Dark", "Light"
@@ -51,12 +51,21 @@ class RecordingApp(ctk.CTk):
         CTKFrame for getting the blue puck's load cell data
     yellow_puck_quaternion_frame:  PuckFileName object
         CTKFrame for getting the blue puck's quaternion data
+    variable_frames: List[PuckFileName]
+        The data name frames in the order of the .mat variables they name
     file_name_textbox: CTkEntry
         One line text box to enter the overall file name
     recording_time_textbox: CTkEntry
         One line text box to enter the recording time in minutes
     file_name: str
         String extracted from the file_name_textbox
+    variable_names: List[str]
+        The .mat variable names read from the variable frames when the
+        recording started
+    next_sample_time: float
+        The monotonic time in seconds get_data is next scheduled for
+    save_thread: threading.Thread
+        Thread saving the last recording, or None if it is saved
 
     Methods
     -------
@@ -66,10 +75,14 @@ class RecordingApp(ctk.CTk):
         Start recording data from the pucks
     get_data()
         Record the data on each sample time step
+    schedule_next_sample()
+        Calls get_data again at the next sample time
     stop_button_callback()
         Tells the app to stop recording and disconnects for the pucks
+    save_data()
+        Saves the stopped recording and allows the next one to start
     write_data()
-        Writes the logged data to a python dictionary and .mat file
+        Writes the logged data to a .mat file
     set_recording_length()
         Finds the total recording time and initializes the pucks' data arrays
 
@@ -171,6 +184,21 @@ class RecordingApp(ctk.CTk):
         self.yellow_puck_quaternion_frame.grid(row=4, column=1, padx=10,
                                                pady=10)
 
+        self.variable_names = []
+
+        # the frames naming each variable of the .mat file in the order of the
+        # logger's .mat variables
+        self.variable_frames = [self.blue_puck_rotational_acceleration_frame,
+                                self.blue_puck_gyroscope_frame,
+                                self.blue_puck_linear_acceleration_frame,
+                                self.blue_puck_load_cell_frame,
+                                self.blue_puck_quaternion_frame,
+                                self.yellow_puck_rotational_acceleration_frame,
+                                self.yellow_puck_gyroscope_frame,
+                                self.yellow_puck_linear_acceleration_frame,
+                                self.yellow_puck_load_cell_frame,
+                                self.yellow_puck_quaternion_frame]
+
         # Create the start recording button
         start_button = ctk.CTkButton(self, text="Start Recording",
                                      command=self.start_button_callback)
@@ -192,13 +220,24 @@ class RecordingApp(ctk.CTk):
                          placeholder_text="Recording Time in Minutes")
         self.recording_time_textbox.grid(row=6, column=1, padx=10, pady=5)
 
-        self.after(int(1000 / self.puck_logger.samples_per_second),
-                   self.get_data)
+        # recordings are saved on their own thread so a long save does not
+        # freeze the app
+        self.save_thread = None
+
+        self.next_sample_time = time.monotonic()
+        self.schedule_next_sample()
 
     def start_button_callback(self) -> None:
         '''
         Start recording data from the pucks
         '''
+        # the data arrays are still being saved from the last recording
+        if self.save_thread is not None:
+            tk.messagebox.showwarning(title="Still Saving!",
+                                      message="Wait for the last recording"
+                                      " to be saved!")
+            return
+
         # get text from line 0 character 0 till the end before the new line
         # character
         self.file_name = self.file_name_textbox.get()
@@ -208,13 +247,17 @@ class RecordingApp(ctk.CTk):
             return
 
         if self.set_recording_length():
+            # the data is saved with the names it had when the recording
+            # started, even if the frames are edited while it records
+            self.variable_names = [frame.get_text()
+                                   for frame in self.variable_frames]
+
             # Start communication to each puck
             self.puck_logger.puck.open()
-            self.puck_logger.puck.send_command(0, SENDVEL, 0x00, 0x01)
-            self.puck_logger.puck.send_command(1, SENDVEL, 0x00, 0x01)
+            self.puck_logger.puck.send_commands([(0, SENDVEL, 0x00, 0x01),
+                                                 (1, SENDVEL, 0x00, 0x01)])
 
             print("Recording Data")
-            self.puck_logger.samples_taken = 0
             self.keep_running = True
 
     def get_data(self) -> None:
@@ -227,109 +270,86 @@ class RecordingApp(ctk.CTk):
             self.puck_logger.store_data(self.puck_logger.puck.puck_0_packet,
                                         self.puck_logger.puck.puck_1_packet)
 
-        self.after(int(1000/self.puck_logger.samples_per_second),
-                   self.get_data)
+        self.schedule_next_sample()
+
+    def schedule_next_sample(self) -> None:
+        '''
+        Calls get_data again at the next sample time
+
+        Each sample is scheduled a fixed period after the last one so the time
+        spent polling and drawing does not add to the period and the sample
+        rate does not drift.
+        '''
+        self.next_sample_time += 1.0 / self.puck_logger.samples_per_second
+        delay = self.next_sample_time - time.monotonic()
+        if delay < 0:
+            # fell behind, so schedule from now instead of rushing to catch up
+            # on the missed samples
+            self.next_sample_time = time.monotonic()
+            delay = 0
+        self.after(int(delay * 1000), self.get_data)
 
     def stop_button_callback(self) -> None:
         '''
         Tells the app to stop recording and disconnects for the pucks
         '''
+        # the recording was already stopped and is being saved
+        if self.save_thread is not None:
+            return
+
         print("Recording Stopped")
         self.keep_running = False
         # disconnects from the pucks and closes the connection to the dongle
-        self.puck_logger.puck.send_command(0, SENDVEL, 0x00, 0x00)
-        self.puck_logger.puck.send_command(1, SENDVEL, 0x00, 0x00)
+        self.puck_logger.puck.send_commands([(0, SENDVEL, 0x00, 0x00),
+                                             (1, SENDVEL, 0x00, 0x00)])
         self.puck_logger.puck.close()
 
-        # save the log file
-        self.write_data()
+        # save the log file without blocking the app
+        self.save_thread = threading.Thread(target=self.save_data)
+        self.save_thread.start()
+
+    def save_data(self) -> None:
+        '''
+        Saves the stopped recording and allows the next one to start
+
+        Runs on its own thread after a recording is stopped.
+        '''
+        try:
+            self.write_data()
+            print("Recording Saved")
+        finally:
+            self.save_thread = None
 
     def write_data(self) -> None:
         '''
-        Writes the logged data to a python dictionary and .mat file
+        Writes the logged data to a .mat file
 
-        Saves the python data into a dictionary and then converts that into a
-        self saved to the data folder. That shelf is then converted to a .mat
-        file.
+        Saves each of the logged variables into a compressed .mat file in the
+        data folder.
         '''
+        # copy any staged samples into the data arrays
+        self.puck_logger.flush_data()
+
         # crop away any unused space.
-        if self.puck_logger.samples_taken < self.puck_logger.max_samples:
-            self.puck_logger.puck_0_rotational_acceleration =\
-                self.puck_logger.\
-                puck_0_rotational_acceleration[0:self.
-                                               puck_logger.samples_taken, :]
-            self.puck_logger.puck_0_gyroscope =\
-                self.puck_logger.\
-                puck_0_gyroscope[0:self.puck_logger.samples_taken, :]
-            self.puck_logger.puck_0_linear_acceleration =\
-                self.puck_logger.\
-                puck_0_linear_acceleration[0:self.puck_logger.samples_taken, :]
-            self.puck_logger.puck_0_load_cell =\
-                self.puck_logger.\
-                puck_0_load_cell[0:self.puck_logger.samples_taken, :]
-            self.puck_logger.puck_0_quaternion =\
-                self.puck_logger.\
-                puck_0_quaternion[0:self.puck_logger.samples_taken, :]
-
-            self.puck_logger.puck_1_rotational_acceleration =\
-                self.puck_logger.\
-                puck_1_rotational_acceleration[0:self.
-                                               puck_logger.samples_taken, :]
-            self.puck_logger.puck_1_gyroscope =\
-                self.puck_logger.\
-                puck_1_gyroscope[0:self.puck_logger.samples_taken, :]
-            self.puck_logger.puck_1_linear_acceleration =\
-                self.puck_logger.\
-                puck_1_linear_acceleration[0:self.puck_logger.samples_taken, :]
-            self.puck_logger.puck_1_load_cell =\
-                self.puck_logger.\
-                puck_1_load_cell[0:self.puck_logger.samples_taken, :]
-            self.puck_logger.puck_1_quaternion =\
-                self.puck_logger.\
-                puck_1_quaternion[0:self.puck_logger.samples_taken, :]
-
-        data_dictionary = {
-            self.blue_puck_rotational_acceleration_frame.get_text():
-                self.puck_logger.puck_0_rotational_acceleration,
-            self.blue_puck_gyroscope_frame.get_text():
-                self.puck_logger.puck_0_gyroscope,
-            self.blue_puck_linear_acceleration_frame.get_text():
-                self.puck_logger.puck_0_linear_acceleration,
-            self.blue_puck_load_cell_frame.get_text():
-                self.puck_logger.puck_0_load_cell,
-            self.blue_puck_quaternion_frame.get_text():
-                self.puck_logger.puck_0_quaternion,
-
-            self.yellow_puck_rotational_acceleration_frame.get_text():
-                self.puck_logger.puck_1_rotational_acceleration,
-            self.yellow_puck_gyroscope_frame.get_text():
-                self.puck_logger.puck_1_gyroscope,
-            self.yellow_puck_linear_acceleration_frame.get_text():
-                self.puck_logger.puck_1_linear_acceleration,
-            self.yellow_puck_load_cell_frame.get_text():
-                self.puck_logger.puck_1_load_cell,
-            self.yellow_puck_quaternion_frame.get_text():
-                self.puck_logger.puck_1_quaternion
-            }
-
-        # creates the path to the log file self
-        data_shelf_name = os.path.join(self.puck_logger.data_folder,
-                                       self.file_name+".shelve")
+        self.puck_logger.crop_data()
 
-        # creates the data folder if it did not exist
-        if not os.path.exists(self.puck_logger.data_folder):
-            os.makedirs(self.puck_logger.data_folder)
+        # name each variable with its frame's text from the start of the
+        # recording. The cropped data arrays are sliced into views, so nothing
+        # is copied before saving
+        pucks_data = (self.puck_logger.puck_0_data,
+                      self.puck_logger.puck_1_data)
+        data_dictionary = {name: pucks_data[puck][:, columns]
+                           for name, (_, puck, columns)
+                           in zip(self.variable_names, MAT_VARIABLES)}
 
-        # saves the data into the data self
-        data_shelf = shelve.open(data_shelf_name)
-        for key in data_dictionary.keys():
-            data_shelf[key] = data_dictionary[key]
-        data_shelf.close()
+        # creates the data folder if it did not exist
+        os.makedirs(self.puck_logger.data_folder, exist_ok=True)
 
-        # saves the data self into a .mat file
+        # saves the data into a compressed .mat file
         mat_path = os.path.join(self.puck_logger.data_folder,
                                 self.file_name+".mat")
-        io.savemat(mat_path, data_dictionary, appendmat=False)
+        io.savemat(mat_path, data_dictionary, appendmat=False,
+                   do_compression=True)
 
     def set_recording_length(self) -> bool:
         '''
@@ -367,25 +387,10 @@ class RecordingApp(ctk.CTk):
         max_samples_needed =\
             int(recording_length_minutes * 60 *
                 self.puck_logger.samples_per_second)
-        self.puck_logger.max_samples = max_samples_needed
 
         # initialize the data arrays of each puck to the total number of
         # samples needed
-        self.puck_logger.puck_0_rotational_acceleration =\
-            np.zeros([max_samples_needed, 3])
-        self.puck_logger.puck_0_gyroscope = np.zeros([max_samples_needed, 3])
-        self.puck_logger.puck_0_linear_acceleration =\
-            np.zeros([max_samples_needed, 3])
-        self.puck_logger.puck_0_load_cell = np.zeros([max_samples_needed, 1])
-        self.puck_logger.puck_0_quaternion = np.zeros([max_samples_needed, 4])
-
-        self.puck_logger.puck_1_rotational_acceleration =\
-            np.zeros([max_samples_needed, 3])
-        self.puck_logger.puck_1_gyroscope = np.zeros([max_samples_needed, 3])
-        self.puck_logger.puck_1_linear_acceleration =\
-            np.zeros([max_samples_needed, 3])
-        self.puck_logger.puck_1_load_cell = np.zeros([max_samples_needed, 1])
-        self.puck_logger.puck_1_quaternion = np.zeros([max_samples_needed, 4])
+        self.puck_logger.allocate_data(max_samples_needed)
 
         return True
 
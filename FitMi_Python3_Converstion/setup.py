@@ -1,7 +1,17 @@
 from setuptools import find_packages, setup
+
+# build the compiled packet parser if Cython is available. The Puck library
+# falls back to parsing with NumPy if it is not built
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize('Puck/puck_packet_c.pyx')
+except ImportError:
+    ext_modules = []
+
 setup(
     name='Puck',
     packages=find_packages(include=['Puck']),
+    ext_modules=ext_modules,
     version='1.0.0',
     description='Library of FitMi Helper Classes',
     long_description='''Library of FitMi Helper Classes. These classes help
@@ -1,7 +1,10 @@
 import matplotlib.pyplot as plt
+import threading
 import time
 import numpy as np
-from Puck.quaternion import q_rotate_vector
+from matplotlib.transforms import Bbox
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+from Puck.quaternion import q_rotation_matrix
 from Puck.hid_puck import HIDPuckDongle
 from Puck.hid_puck import SENDVEL
 
@@ -19,18 +22,49 @@ class OrientationScope(object):
         Connects to the dongle for communicating to and from the pucks
     samples_per_second : int
         The number of times the pucks are queried per second
+    frames_per_second : int
+        The number of times the plot is redrawn per second
     max_run_time_seconds : int
         Total amount of time the code runs for
     max_samples : int
         The total number of samples to take
     puck_number : int
         The blue puck (0) or the yellow puck (1)
+    puck_data : PuckPacket object
+        The data packet of the selected puck
     fig : matplotlib.pyplot.figure
         The 3D figure for showing the orientation of the puck
     ax : matplotlib.pyplot.axis
         The axis of the 3D figure
-    data_point : matplotlib.pyplot.scatter
-        Scatter plot showing the x, y, z axis of the puck
+    axis_segments : numpy array
+        The x, y, and z coordinates of the origin and the end of each of the
+        puck's axes
+    axis_lines : mpl_toolkits.mplot3d.art3d.Line3DCollection
+        Lines from the origin along the x, y, and z axes of the puck
+    bg : matplotlib.backends.backend_agg.BufferRegion
+        The axis region without the axis lines, used for blitting
+    line_bbox : matplotlib.transforms.Bbox
+        The area of the canvas the axis lines were last drawn over
+    quaternion : numpy array
+        Copy of the selected puck's newest quaternion from the acquisition
+        thread
+    drawn_quaternion : numpy array
+        The quaternion the axis lines were last drawn for
+    keep_running : bool
+        If the acquisition thread should keep polling the puck
+    acquisition_thread : threading.Thread
+        Thread polling the puck at the sample rate while the scope runs
+    replay_axis_ends : numpy array
+        The ends of the rotated axes for every sample being replayed
+    replay_samples_per_second : float
+        The sample rate of the quaternions being replayed
+    replay_start_time : float
+        The monotonic time in seconds the replay started
+    next_frame_time : float
+        The monotonic time in seconds the next frame is scheduled for
+    timer : matplotlib.backend_bases.TimerBase
+        Single shot timer of the figure's GUI that calls get_data or
+        replay_frame
 
     Methods
     -------
@@ -38,8 +72,24 @@ class OrientationScope(object):
         Creates the initial 3D plot of the puck axes
     start_scope()
         Starts communication with puck and updates plot with rotation
+    acquire_data()
+        Polls the puck at the sample rate and keeps its newest quaternion
+    get_data()
+        Plots the newest orientation and schedules the next frame
+    replay(quaternions, samples_per_second)
+        Replays recorded quaternions of a puck on the plot
+    replay_frame()
+        Plots the replayed orientation due now and schedules the next frame
+    schedule_next_frame()
+        Starts the timer again at the next frame time
+    on_draw(event)
+        Copies the axis region after the figure is fully redrawn
+    line_extent()
+        Finds the area of the canvas covered by the projected axis lines
     update_plot()
         Takes the puck data and updates the 3D plot of orientation
+    draw_axis_lines()
+        Draws the axis lines at their segments over the background
     '''
     def __init__(self, puck_number: int = 0) -> None:
         '''
@@ -52,10 +102,20 @@ class OrientationScope(object):
         '''
         self.puck = HIDPuckDongle()
         self.samples_per_second = 40
+        # the gizmo looks smooth at half the sample rate, so it is only
+        # redrawn on every other sample
+        self.frames_per_second = 20
         self.max_run_time_seconds = 100
         self.max_samples = self.samples_per_second*self.max_run_time_seconds
         self.puck_number = puck_number
 
+        # selects the puck data packet based on the puck's id. The dongle
+        # updates the same packet in place, so it is only selected once
+        if self.puck_number == 1:
+            self.puck_data = self.puck.puck_1_packet
+        else:
+            self.puck_data = self.puck.puck_0_packet
+
         self.fig = plt.figure()
         self.fig.set_size_inches(6, 6, forward=True)
         self.ax = self.fig.add_subplot(111, projection='3d')  # projection='3d'
@@ -63,12 +123,38 @@ class OrientationScope(object):
         self.ax.set_ylim(-2, 2)
         self.ax.set_zlim(-2, 2)
 
+        # the x, y, and z coordinates of the origin and the end of each axis.
+        # The origins never change, so only the ends of the axes are written
+        self.axis_segments = np.zeros((3, 2, 3))
+        self.axis_segments[:, 1, :] = np.eye(3)
+
+        # the x, y, and z axes are drawn as one collection of red, green, and
+        # blue lines that is created once and only has its ends moved. It is
+        # animated so it is left out of full redraws and drawn by blitting
+        self.axis_lines = Line3DCollection(self.axis_segments,
+                                           colors=["r", "g", "b"],
+                                           animated=True)
+        self.ax.add_collection3d(self.axis_lines, autolim=False)
+
+        # copy the axis region whenever the figure is fully redrawn, such as
+        # after a resize or the view being rotated
+        self.bg = None
+        self.line_bbox = None
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
         self.fig.show(False)
-        plt.draw()
-        line_x = [0, 1, 0, 0]
-        line_y = [0, 0, 1, 0]
-        line_z = [0, 0, 0, 1]
-        self.data_plot = self.ax.scatter(line_x, line_y, line_z, c="b")
+        self.fig.canvas.draw()
+
+        # the puck is polled on its own thread so a slow read does not stall
+        # the window. The frame timer is made when the scope starts
+        self.quaternion = self.puck_data.quaternion.copy()
+        self.drawn_quaternion = None
+        self.keep_running = False
+        self.acquisition_thread = None
+        self.replay_axis_ends = None
+        self.replay_samples_per_second = None
+        self.replay_start_time = None
+        self.next_frame_time = None
+        self.timer = None
 
     def start_scope(self) -> None:
         '''
@@ -82,55 +168,218 @@ class OrientationScope(object):
         self.puck.open()
         self.puck.send_command(self.puck_number, SENDVEL, 0x00, 0x01)
 
-        tick_up = 0  # counter to indicate when a second has passed
         print("recording data")
-        # records data at a time period based on the samples per second
+        # sample the puck on the acquisition thread
+        self.keep_running = True
+        self.acquisition_thread = threading.Thread(target=self.acquire_data)
+        self.acquisition_thread.daemon = True
+        self.acquisition_thread.start()
+
+        # plot the orientation from a timer of the figure's GUI so its event
+        # loop runs between frames and keeps the window responsive
+        self.next_frame_time = time.monotonic()
+        self.timer = self.fig.canvas.new_timer(interval=0)
+        self.timer.single_shot = True
+        self.timer.add_callback(self.get_data)
+        self.timer.start()
+
+        # run the GUI until every sample is taken or the window is closed
+        plt.show()
+        self.timer.stop()
+
+        # wait for the last poll to finish before stopping the puck
+        self.keep_running = False
+        self.acquisition_thread.join()
+        self.acquisition_thread = None
+        self.puck.stop()
+
+    def acquire_data(self) -> None:
+        '''
+        Polls the puck at the sample rate and keeps its newest quaternion
+
+        Runs on its own thread and stops after the last sample. The packet is
+        updated in place by the dongle, so a copy of its quaternion is kept
+        for the plot to read whole.
+        '''
+        # Each sample is scheduled a fixed period after the last one so the
+        # time spent polling does not add to the period
+        period = 1.0 / self.samples_per_second
+
+        next_poll_time = time.monotonic()
         for i in range(self.max_samples):
+            if not self.keep_running:
+                break
             self.puck.checkForNewPuckData()
-            self.update_plot()  # updates the plots based on the puck data
+            self.quaternion = self.puck_data.quaternion.copy()
 
-            time.sleep(1.0 / self.samples_per_second)
-            tick_up += 1
             # plot a dot when a second has passed
-            if tick_up > self.samples_per_second:
-                tick_up = 0
+            if (i + 1) % self.samples_per_second == 0:
                 print(".")
 
-        self.puck.stop()
+            next_poll_time += period
+            sleep_time = next_poll_time - time.monotonic()
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+            else:
+                # fell behind, so schedule from now instead of rushing to
+                # catch up on the missed samples
+                next_poll_time = time.monotonic()
 
-    def update_plot(self) -> None:
+    def get_data(self) -> None:
         '''
-        Takes the puck data and updates the 3D plot of orientation
+        Plots the newest orientation and schedules the next frame
 
-        Selects which puck data packet to use and updates orientation based on
-        the puck's quaternion
+        The figure is closed once the acquisition thread has taken its last
+        sample.
         '''
-        # selects the puck data packet based on the puck's id
-        if self.puck_number == 1:
-            puck_data = self.puck.puck_1_packet
-        else:
-            puck_data = self.puck.puck_0_packet
+        if not self.acquisition_thread.is_alive():
+            plt.close(self.fig)
+            return
+
+        self.update_plot()  # updates the plots based on the puck data
+        self.schedule_next_frame()
+
+    def replay(self, quaternions: np.ndarray,
+               samples_per_second: float = None) -> None:
+        '''
+        Replays recorded quaternions of a puck on the plot
+
+        The axes of every sample are found at once before the replay starts,
+        so a frame only copies the axis ends of the sample due at its time.
+        The replay runs in real time, skipping the samples between frames, and
+        the figure is closed after the last sample.
+
+        Parameters
+        ----------
+        quaternions : numpy array
+            The puck's w, x, y, and z quaternion values with a row per sample,
+            such as a quaternion variable of a log file
+        samples_per_second : float, optional
+            The sample rate the quaternions were recorded at. The scope's
+            sample rate is used if None
+        '''
+        if samples_per_second is None:
+            samples_per_second = self.samples_per_second
 
-        # make a vector of each axis and rotate it by the puck's quaternion
-        vx = np.array([1, 0, 0])
-        vx = q_rotate_vector(puck_data.quaternion, vx)
+        # the rows of each transposed rotation matrix are the ends of the
+        # rotated axes
+        self.replay_axis_ends = np.swapaxes(q_rotation_matrix(quaternions),
+                                            -1, -2)
+        self.replay_samples_per_second = samples_per_second
 
-        vy = np.array([0, 1, 0])
-        vy = q_rotate_vector(puck_data.quaternion, vy)
+        # plot the replay from a timer of the figure's GUI like the live scope
+        self.replay_start_time = time.monotonic()
+        self.next_frame_time = self.replay_start_time
+        self.timer = self.fig.canvas.new_timer(interval=0)
+        self.timer.single_shot = True
+        self.timer.add_callback(self.replay_frame)
+        self.timer.start()
 
-        vz = np.array([0, 0, 1])
-        vz = q_rotate_vector(puck_data.quaternion, vz)
+        # run the GUI until the replay ends or the window is closed
+        plt.show()
+        self.timer.stop()
 
-        # draw a line to each rotated axis
-        line_x = [0, vx[0], vy[0], vz[0]]
-        line_y = [0, vx[1], vy[1], vz[1]]
-        line_z = [0, vx[2], vy[2], vz[2]]
+    def replay_frame(self) -> None:
+        '''
+        Plots the replayed orientation due now and schedules the next frame
+        '''
+        sample = int((time.monotonic() - self.replay_start_time) *
+                     self.replay_samples_per_second)
+        if sample >= len(self.replay_axis_ends):
+            plt.close(self.fig)
+            return
+
+        self.axis_segments[:, 1, :] = self.replay_axis_ends[sample]
+        self.draw_axis_lines()
+        self.schedule_next_frame()
+
+    def schedule_next_frame(self) -> None:
+        '''
+        Starts the timer again at the next frame time
+
+        Each frame is scheduled a fixed period after the last one so the time
+        spent drawing does not add to the period.
+        '''
+        self.next_frame_time += 1.0 / self.frames_per_second
+        delay = self.next_frame_time - time.monotonic()
+        if delay < 0:
+            # fell behind, so schedule from now instead of rushing to catch up
+            # on the missed frames
+            self.next_frame_time = time.monotonic()
+            delay = 0
+        self.timer.interval = int(delay * 1000)
+        self.timer.start()
+
+    def on_draw(self, event) -> None:
+        '''
+        Copies the axis region after the figure is fully redrawn
+
+        A full redraw leaves out the animated axis lines and may move or
+        rotate the axis, so the background used for blitting is copied again
+        and the axis lines are drawn back on top of it.
+
+        Parameters
+        ----------
+        event : matplotlib.backend_bases.DrawEvent
+            The draw event of the figure's canvas
+        '''
+        self.bg = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        self.axis_lines.do_3d_projection()
+        self.ax.draw_artist(self.axis_lines)
+        self.line_bbox = self.line_extent()
+
+    def line_extent(self) -> Bbox:
+        '''
+        Finds the area of the canvas covered by the projected axis lines
+
+        Returns
+        -------
+        matplotlib.transforms.Bbox
+            The area around the axis lines padded by their width and limited
+            to the axis
+        '''
+        # the projected segments are in the 2D data coordinates of the axis
+        points = self.ax.transData.transform(
+            np.concatenate(self.axis_lines.get_segments()))
+        pad = self.axis_lines.get_linewidth()[0] * self.fig.dpi / 72 + 1
+        line_bbox = Bbox([points.min(axis=0), points.max(axis=0)])
+        return Bbox.intersection(line_bbox.padded(pad), self.ax.bbox)
+
+    def update_plot(self) -> None:
+        '''
+        Takes the puck data and updates the 3D plot of orientation
+
+        Updates orientation based on the selected puck's newest quaternion.
+        Nothing is drawn if the puck has not moved since the last frame.
+        '''
+        # the acquisition thread replaces the quaternion, so it is read once
+        quaternion = self.quaternion
+        if np.array_equal(quaternion, self.drawn_quaternion):
+            return
+        self.drawn_quaternion = quaternion
+
+        # the columns of the puck's rotation matrix are each axis rotated by
+        # the puck's quaternion, so they are the ends of the rotated axes
+        self.axis_segments[:, 1, :] = q_rotation_matrix(quaternion).T
+        self.draw_axis_lines()
+
+    def draw_axis_lines(self) -> None:
+        '''
+        Draws the axis lines at their segments over the background
+        '''
+        # move the ends of the axis lines and redraw only them over the
+        # background of the axis. The lines are projected with the axis' last
+        # view since they are not projected outside of a full redraw
+        self.axis_lines.set_segments(self.axis_segments)
+        self.fig.canvas.restore_region(self.bg)
+        self.axis_lines.do_3d_projection()
+        self.ax.draw_artist(self.axis_lines)
 
-        # redraw the scatter plot of the puck's orientation
-        if self.data_plot:
-            self.ax.collections.remove(self.data_plot)
-        self.data_plot = self.ax.scatter(line_x, line_y, line_z, c="b")
-        plt.pause(.00005)  # pause small amount of time to allow update.
+        # only the area the lines were last drawn over and the area they are
+        # drawn over now changed, so only that is shown instead of the axis
+        line_bbox = self.line_extent()
+        self.fig.canvas.blit(Bbox.union([self.line_bbox, line_bbox]))
+        self.line_bbox = line_bbox
 
 
 if __name__ == "__main__":